@@ -0,0 +1,30 @@
+"""Enable pg_trgm
+
+Revision ID: 0001_pg_trgm
+Revises:
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_pg_trgm"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Base revision: autogenerated migrations build ix_events_title_trgm
+    # (gin_trgm_ops) and /search uses its %> operator, both from pg_trgm.
+    # metadata.create_all gets it from the before_create hook in db/models.py.
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP EXTENSION IF EXISTS pg_trgm")
@@ -13,6 +13,8 @@ def cli():
 def init_db():
     """Create database tables."""
 
+    import src.app.db.base  # noqa: F401 - registers models (and pg_trgm DDL)
+
     async def _init():
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
@@ -38,7 +40,11 @@ def trigger_ingest():
 
     async def _trigger():
         redis = await create_pool(
-            RedisSettings(host=settings.REDIS_HOST, port=settings.REDIS_PORT)
+            RedisSettings(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                database=settings.REDIS_DB,
+            )
         )
         await redis.enqueue_job("ingest_ctftime_events", limit=50)
         print("Job 'ingest_ctftime_events' enqueued successfully.")
@@ -47,6 +53,133 @@ def trigger_ingest():
     asyncio.run(_trigger())
 
 
+@cli.command(name="backfill")
+@click.option("--years", default=3, show_default=True, help="Years of history.")
+@click.option("--limit", default=100, show_default=True, help="Events per page.")
+@click.option("--concurrency", default=8, show_default=True, help="Parallel slices.")
+def backfill(years, limit, concurrency):
+    """Load past CTFtime events into the database (no notifications)."""
+    from datetime import datetime, timedelta, timezone
+    from src.app.workers.http import HttpFetcher
+    from src.app.workers.scrapers.ctftime import CTFTimeScraper
+
+    async def _backfill():
+        finish = datetime.now(timezone.utc)
+        start = finish - timedelta(days=365 * years)
+        async with HttpFetcher() as fetcher:
+            scraper = CTFTimeScraper(fetcher=fetcher)
+            data, _ = await scraper.fetch_window(
+                start, finish, limit=limit, concurrency=concurrency
+            )
+            new_events = await scraper.normalize_and_save(data, notify=False)
+        print(f"Backfilled {len(data)} events ({len(new_events)} new).")
+
+    asyncio.run(_backfill())
+
+
+@cli.command(name="backfill_tags")
+def backfill_tags():
+    """Fill Event.tags for events stored before the tags column existed."""
+    from src.app.db.session import AsyncSessionLocal
+    from src.app.services.cache import bump_data_version
+    from src.app.services.event_filters import backfill_tags as _backfill_tags
+
+    async def _run():
+        async with AsyncSessionLocal() as session:
+            stats = await _backfill_tags(session)
+        await bump_data_version()
+        print(
+            f"Tagged {stats['from_meta']} events from meta, "
+            f"{stats['retagged']} from their text."
+        )
+
+    asyncio.run(_run())
+
+
+@cli.command(name="rekey_rss")
+def rekey_rss():
+    """Move RSS events saved under the old hash() ids to their stable ids."""
+    from src.app.core.config import settings
+    from src.app.workers.http import HttpFetcher
+    from src.app.workers.scrapers.rss import RSSScraper
+
+    async def _rekey():
+        async with HttpFetcher() as fetcher:
+            scraper = RSSScraper(fetcher=fetcher)
+            adopted = await scraper.rekey_legacy_rows(settings.RSS_FEEDS)
+        print(f"Re-keyed {adopted} legacy RSS events.")
+
+    asyncio.run(_rekey())
+
+
+@cli.command(name="subscribe")
+@click.option("--chat-id", required=True, help="Telegram chat to alert.")
+@click.option("--tags", default="", help="Comma-separated tags (any of them).")
+@click.option("--type", "event_type", default=None, help="ctf or conference.")
+@click.option("--format", "event_format", default=None, help="e.g. Jeopardy.")
+@click.option("--min-weight", type=float, default=None, help="Minimum weight.")
+def subscribe(chat_id, tags, event_type, event_format, min_weight):
+    """Add an alert subscription for a chat."""
+    from src.app.db.session import AsyncSessionLocal
+    from src.app.services.subscriptions import SubscriptionService
+
+    async def _subscribe():
+        async with AsyncSessionLocal() as session:
+            subscription = await SubscriptionService.subscribe(
+                session,
+                chat_id,
+                tags=tags.split(",") if tags else None,
+                type=event_type,
+                format=event_format,
+                min_weight=min_weight,
+            )
+        print(f"Subscription {subscription.id} created for chat {chat_id}.")
+
+    asyncio.run(_subscribe())
+
+
+@cli.command(name="unsubscribe")
+@click.argument("subscription_id", type=int)
+def unsubscribe(subscription_id):
+    """Deactivate an alert subscription."""
+    from src.app.db.session import AsyncSessionLocal
+    from src.app.services.subscriptions import SubscriptionService
+
+    async def _unsubscribe():
+        async with AsyncSessionLocal() as session:
+            found = await SubscriptionService.unsubscribe(session, subscription_id)
+        print("Unsubscribed." if found else "No active subscription with that id.")
+
+    asyncio.run(_unsubscribe())
+
+
+@cli.command(name="bench_calendar")
+@click.option("--runs", default=5, show_default=True, help="Renders per renderer.")
+def bench_calendar(runs):
+    """Compare the streaming ICS renderer against the ics-library baseline."""
+    import time
+    from src.app.db.session import AsyncSessionLocal
+    from src.app.services.calendar_feed import render_calendar, render_calendar_ics
+
+    async def _bench():
+        for name, renderer in [
+            ("ics library", render_calendar_ics),
+            ("streaming", render_calendar),
+        ]:
+            timings = []
+            for _ in range(runs):
+                async with AsyncSessionLocal() as session:
+                    started = time.perf_counter()
+                    body = await renderer(session)
+                    timings.append(time.perf_counter() - started)
+            print(
+                f"{name:>12}: best {min(timings) * 1000:.1f} ms, "
+                f"{len(body) / 1024:.0f} KiB"
+            )
+
+    asyncio.run(_bench())
+
+
 @cli.command(name="self_check")
 def self_check():
     """Perform a system-wide self check and exit with status code."""
@@ -0,0 +1,25 @@
+from typing import Optional
+
+from fastapi import Query
+
+from src.app.services.event_filters import EventFilters
+
+
+def event_filters(
+    type: Optional[str] = Query(None, description="Filter by type (ctf, conference)"),
+    tags: Optional[str] = Query(
+        None, description="Comma-separated tags, e.g. pwn,crypto"
+    ),
+    tag_match: str = Query(
+        "any", pattern="^(any|all)$", description="Match any or all of the tags"
+    ),
+    format: Optional[str] = Query(None, description="e.g. Jeopardy, Attack-Defense"),
+    min_weight: Optional[float] = Query(None, ge=0, description="Minimum weight"),
+) -> EventFilters:
+    return EventFilters(
+        type=type,
+        tags=tags.split(",") if tags else None,
+        match_all=tag_match == "all",
+        format=format,
+        min_weight=min_weight,
+    )
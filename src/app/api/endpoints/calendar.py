@@ -1,42 +1,62 @@
-from fastapi import APIRouter, Depends, Response
-from sqlalchemy.future import select
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from src.app.api.deps import event_filters
+from src.app.core.config import settings
 from src.app.db.session import get_db
-from src.app.db.models import Event
-from ics import Calendar, Event as IcsEvent
-from datetime import datetime
+from src.app.services.calendar_feed import (
+    accepts_gzip,
+    feed_validators,
+    get_cached_feed,
+    not_modified,
+    stream_and_cache,
+)
+from src.app.services.event_filters import EventFilters
 
 router = APIRouter()
 
 
 @router.get("/ctf.ics", response_class=Response)
-async def get_cal_feed(db: AsyncSession = Depends(get_db)):
+async def get_cal_feed(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    filters: EventFilters = Depends(event_filters),
+):
     """
-    Generate an ICS feed for all upcoming CTFs.
+    Generate an ICS feed for all upcoming CTFs, optionally narrowed per team,
+    e.g. /calendar/ctf.ics?tags=pwn,crypto&min_weight=25.
+    Served from cache with ETag/Last-Modified, so polling clients mostly get 304s.
     """
-    # Fetch upcoming events
-    query = (
-        select(Event)
-        .where(Event.start_time > datetime.now())
-        .order_by(Event.start_time.asc())
-    )
-    result = await db.execute(query)
-    db_events = result.scalars().all()
+    feed, state = await get_cached_feed(filters)
+    headers = {
+        "Cache-Control": f"public, max-age={settings.CALENDAR_CACHE_TTL}",
+        "Vary": "Accept-Encoding",
+    }
+    # Validators follow the data version, so they are known before rendering
+    if feed is not None:
+        headers.update(feed.validators)
+    elif state is not None:
+        headers.update(feed_validators(state))
 
-    cal = Calendar()
-    cal.creator = "CTF Tracker MVP"
+    if not_modified(
+        headers,
+        request.headers.get("if-none-match"),
+        request.headers.get("if-modified-since"),
+    ):
+        return Response(status_code=304, headers=headers)
 
-    for e in db_events:
-        c = IcsEvent()
-        c.name = f"[{e.type.upper()}] {e.title}"
-        c.begin = e.start_time
-        c.end = e.end_time
-        c.description = (
-            f"{e.description}\n\nFormat: {e.format}\nWeight: {e.weight}\n\nURL: {e.url}"
+    if feed is None:
+        # Miss: stream straight off the DB cursor, filling the cache on the way
+        return StreamingResponse(
+            stream_and_cache(db, filters, state),
+            media_type="text/calendar",
+            headers=headers,
         )
-        c.url = e.url
-        c.location = e.format if e.format else "Online"
 
-        cal.events.add(c)
+    if accepts_gzip(request.headers.get("accept-encoding", "")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(
+            content=feed.gzipped, media_type="text/calendar", headers=headers
+        )
 
-    return Response(content=str(cal), media_type="text/calendar")
+    return Response(content=feed.body, media_type="text/calendar", headers=headers)
@@ -1,74 +1,208 @@
+import base64
+import json
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import TypeAdapter
+from sqlalchemy import func, or_, tuple_
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from src.app.api.deps import event_filters
 from src.app.db.session import get_db
 from src.app.db.models import Event
-from datetime import datetime
+from src.app.services.cache import get_cached_response, store_response
+from src.app.services.snapshot import snapshots
+from src.app.schemas.event import EventDetail, EventSearchHit, EventSummary
+from src.app.services.event_filters import EventFilters
+from datetime import datetime, timezone
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
+# Larger requested limits are clamped to this
+MAX_PAGE_SIZE = 500
 
-@router.get("/", response_model=List[dict])
+# Search returns a ranked shortlist, not a pageable listing
+MAX_SEARCH_RESULTS = 50
+SEARCH_CONFIG = "english"
+
+# Only the columns each response needs; description/meta stay in the DB for lists
+SUMMARY_COLUMNS = (
+    Event.id,
+    Event.title,
+    Event.start_time,
+    Event.end_time,
+    Event.type,
+    Event.format,
+    Event.weight,
+    Event.url,
+    Event.logo_url.label("logo"),
+    Event.tags,
+)
+DETAIL_COLUMNS = (
+    Event.id,
+    Event.title,
+    Event.description,
+    Event.meta.label("raw_metadata"),
+    Event.start_time,
+    Event.end_time,
+    Event.url,
+    Event.type,
+    Event.format,
+)
+
+
+# Responses are shaped by their Pydantic models and encoded to JSON in one pass
+SUMMARY_LIST = TypeAdapter(List[EventSummary])
+SEARCH_HITS = TypeAdapter(List[EventSearchHit])
+DETAIL = TypeAdapter(EventDetail)
+
+
+def render(adapter: TypeAdapter, data, headers: Optional[dict] = None) -> Response:
+    return Response(
+        adapter.dump_json(adapter.validate_python(data)),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+def encode_cursor(start_time: datetime, event_id: int) -> str:
+    """Opaque keyset cursor for the (start_time, id) sort order."""
+    raw = json.dumps([start_time.isoformat(), event_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        start_time, event_id = json.loads(raw)
+        return datetime.fromisoformat(start_time), int(event_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(events: list[dict], limit: int) -> tuple[list[dict], Optional[str]]:
+    """Trim the extra look-ahead row; its presence yields the next cursor."""
+    if len(events) <= limit:
+        return events, None
+    events = events[:limit]
+    return events, encode_cursor(events[-1]["start_time"], events[-1]["id"])
+
+
+def list_headers(request: Request, next_cursor: Optional[str]) -> dict:
+    if not next_cursor:
+        return {}
+    next_url = request.url.include_query_params(cursor=next_cursor)
+    return {"X-Next-Cursor": next_cursor, "Link": f'<{next_url}>; rel="next"'}
+
+
+def cached_json(body: bytes, headers: dict) -> Response:
+    return Response(
+        body, media_type="application/json", headers={**headers, "X-Cache": "HIT"}
+    )
+
+
+@router.get("/", response_model=List[EventSummary])
 async def list_events(
+    request: Request,
     db: AsyncSession = Depends(get_db),
-    type: Optional[str] = Query(None, description="Filter by type (ctf, conference)"),
+    filters: EventFilters = Depends(event_filters),
     status: Optional[str] = Query(None, description="upcoming, past"),
-    limit: int = 100,
+    limit: int = Query(100, ge=1, description=f"Page size (max {MAX_PAGE_SIZE})"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the last page"),
 ):
     """
-    List events with optional filtering.
+    List events with optional filtering (type, tags, format, min_weight, status).
+    Keyset-paginated over (start_time, id): when more rows exist the cursor for
+    the next page is returned in the X-Next-Cursor header (and a Link header).
     """
-    query = select(Event)
+    limit = min(limit, MAX_PAGE_SIZE)
+    snapshot = snapshots.current
+    if status == "upcoming" and snapshot is not None:
+        # Answered from this process's in-memory snapshot: no Redis or DB trip
+        after = decode_cursor(cursor) if cursor else None
+        events, next_cursor = paginate(snapshot.query(filters, limit + 1, after), limit)
+        return render(SUMMARY_LIST, events, list_headers(request, next_cursor))
+
+    # Normalized, so equivalent requests share one Redis entry
+    params = f"{filters.cache_key()}&status={status or ''}&limit={limit}&cursor={cursor or ''}"
+    cached, version = await get_cached_response("events", params)
+    if cached:
+        body, stored = cached
+        # Link embeds the request URL, so only the cursor is cached
+        return cached_json(body, list_headers(request, stored.get("next_cursor")))
 
-    if type:
-        query = query.where(Event.type == type)
+    query = filters.apply(select(*SUMMARY_COLUMNS))
 
     if status == "upcoming":
-        query = query.where(Event.start_time > datetime.now())
+        query = query.where(Event.start_time > datetime.now(timezone.utc))
     elif status == "past":
-        query = query.where(Event.end_time < datetime.now())
+        query = query.where(Event.end_time < datetime.now(timezone.utc))
 
-    query = query.order_by(Event.start_time.asc()).limit(limit)
+    if cursor:
+        # Seeks via ix_events_start_time_id, so deep pages cost the same as the first
+        query = query.where(tuple_(Event.start_time, Event.id) > decode_cursor(cursor))
+
+    # One extra row tells us whether there is a next page
+    query = query.order_by(Event.start_time.asc(), Event.id.asc()).limit(limit + 1)
 
     result = await db.execute(query)
-    events = result.scalars().all()
-
-    # Simple manual serialization for MVP (Pydantic models later)
-    return [
-        {
-            "id": e.id,
-            "title": e.title,
-            "start_time": e.start_time,
-            "end_time": e.end_time,
-            "type": e.type,
-            "format": e.format,
-            "weight": e.weight,
-            "url": e.url,
-            "logo": e.logo_url,
-        }
-        for e in events
-    ]
-
-
-@router.get("/{event_id}")
+    # Row mappings skip per-field ORM hydration
+    events = [dict(row) for row in result.mappings()]
+
+    events, next_cursor = paginate(events, limit)
+    response = render(SUMMARY_LIST, events, list_headers(request, next_cursor))
+    if version is not None:
+        await store_response(
+            "events", params, version, response.body, {"next_cursor": next_cursor}
+        )
+    return response
+
+
+@router.get("/search", response_model=List[EventSearchHit])
+async def search_events(
+    db: AsyncSession = Depends(get_db),
+    filters: EventFilters = Depends(event_filters),
+    q: str = Query(..., min_length=2, max_length=200, description="Search text"),
+    limit: int = Query(20, ge=1, description=f"Max results (max {MAX_SEARCH_RESULTS})"),
+):
+    """
+    Ranked search over titles and descriptions.
+    Full-text matches (websearch syntax: quotes, OR, -term) hit the GIN index on
+    search_vector; misspelled titles still match through pg_trgm word similarity.
+    """
+    limit = min(limit, MAX_SEARCH_RESULTS)
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    score = func.ts_rank_cd(Event.search_vector, tsquery) + func.word_similarity(
+        q, Event.title
+    )
+
+    query = filters.apply(select(*SUMMARY_COLUMNS, score.label("score")))
+    # Both branches are index-backed (ix_events_search_vector, ix_events_title_trgm)
+    query = query.where(
+        or_(Event.search_vector.op("@@")(tsquery), Event.title.op("%>")(q))
+    )
+    query = query.order_by(score.desc(), Event.start_time.asc(), Event.id.asc())
+
+    result = await db.execute(query.limit(limit))
+    return render(SEARCH_HITS, result.mappings().all())
+
+
+@router.get("/{event_id}", response_model=EventDetail)
 async def get_event(event_id: int, db: AsyncSession = Depends(get_db)):
     """
     Get details of a specific event.
     """
-    result = await db.execute(select(Event).where(Event.id == event_id))
-    event = result.scalar_one_or_none()
+    cached, version = await get_cached_response("event", str(event_id))
+    if cached:
+        return cached_json(*cached)
+
+    result = await db.execute(select(*DETAIL_COLUMNS).where(Event.id == event_id))
+    event = result.mappings().one_or_none()
 
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    return {
-        "id": event.id,
-        "title": event.title,
-        "description": event.description,
-        "raw_metadata": event.meta,
-        **{
-            k: getattr(event, k)
-            for k in ["start_time", "end_time", "url", "type", "format"]
-        },
-    }
+    response = render(DETAIL, event)
+    if version is not None:
+        await store_response("event", str(event_id), version, response.body, {})
+    return response
@@ -1,4 +1,4 @@
-from typing import List, Union
+from typing import List, Optional, Union
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import PostgresDsn, validator
@@ -28,13 +28,98 @@ class Settings(BaseSettings):
             path=f"{values.get('POSTGRES_DB') or ''}",
         )
 
+    # Engine / pool profile (per process: size the API and worker pools apart)
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800  # seconds; -1 disables
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Behind PgBouncer in transaction mode: no cached/named prepared statements
+    DB_PGBOUNCER: bool = False
+
+    # Readiness probe: per-check timeout and in-process result cache (seconds)
+    HEALTH_CHECK_TIMEOUT: float = 2.0
+    HEALTH_CACHE_SECONDS: float = 5.0
+
+    # Prometheus endpoint of the ARQ worker process (the API serves /metrics)
+    WORKER_METRICS_PORT: Optional[int] = 9101
+
     # Redis for ARQ
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
+    REDIS_DB: int = 0
+
+    # Scraper HTTP layer (shared pooled client per worker)
+    SCRAPER_HTTP2: bool = False
+    SCRAPER_TIMEOUT: float = 10.0
+    SCRAPER_CONNECT_TIMEOUT: float = 5.0
+    SCRAPER_MAX_CONNECTIONS: int = 20
+    SCRAPER_MAX_KEEPALIVE: int = 10
+    SCRAPER_MAX_RETRIES: int = 3
+    SCRAPER_BACKOFF_BASE: float = 0.5
+    SCRAPER_BACKOFF_MAX: float = 30.0
+
+    # CTFtime sync windows
+    CTFTIME_SLICE_DAYS: int = 30
+    CTFTIME_NEAR_WINDOW_DAYS: int = 60  # refreshed on every run
+    CTFTIME_HORIZON_DAYS: int = 365  # how far ahead incremental sync reaches
+    CTFTIME_SYNC_CONCURRENCY: int = 4
+
+    # RSS ingestion
+    RSS_FEEDS: List[str] = [
+        "https://www.usenix.org/rss.xml",  # USENIX Conferences
+    ]
+    RSS_MAX_CONCURRENCY: int = 20
+    RSS_PER_HOST_CONCURRENCY: int = 2
+    RSS_FEED_TIMEOUT: float = 60.0
+    RSS_PARSE_OFFLOAD_BYTES: int = 256 * 1024  # parse in a thread above this
+
+    # Tagging taxonomy (JSON file {category: [terms]}); built-in list when unset
+    TAG_KEYWORDS_FILE: Optional[str] = None
+    # Model-backed tagging ("local" is an offline stand-in); off when unset
+    TAG_BACKEND: Optional[str] = None
+    TAG_BACKEND_BATCH_SIZE: int = 20
+    TAG_BACKEND_CONCURRENCY: int = 2
+    TAG_BACKEND_TIMEOUT: float = 15.0
+    TAG_CACHE_TTL: int = 30 * 24 * 3600
+
+    # Rendered ICS feed lifetime (also rebuilt whenever ingestion changes events)
+    CALENDAR_CACHE_TTL: int = 300
+    CALENDAR_STREAM_BATCH: int = 500  # rows per server-side cursor fetch
+
+    # Cached /api/events responses; ingest invalidates them immediately, the TTL
+    # bounds drift of time-relative queries (status=upcoming/past)
+    EVENTS_CACHE_TTL: int = 60
+    # In-memory upcoming-events snapshot per API process (status=upcoming lists)
+    EVENTS_SNAPSHOT: bool = True
+    EVENTS_SNAPSHOT_RETRY: float = 5.0  # seconds before resubscribing after errors
 
     # Telegram
     TELEGRAM_BOT_TOKEN: str
     TELEGRAM_ADMIN_IDS: List[int] = []
+    # Bot API limits: ~30 msg/s overall (raise with paid broadcasts), ~1/s per chat
+    TELEGRAM_GLOBAL_RATE: float = 30.0
+    TELEGRAM_PER_CHAT_RATE: float = 1.0
+    TELEGRAM_MAX_RETRIES: int = 3
+    TELEGRAM_TIMEOUT: float = 10.0
+    TELEGRAM_MAX_CONNECTIONS: int = 50
+
+    # Notification outbox drained by the deliver_notifications job
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_MAX_BATCHES: int = 20  # per job run; the cron picks up the rest
+    OUTBOX_MAX_ATTEMPTS: int = 5
+    OUTBOX_LEASE_SECONDS: int = 300  # claimed rows reappear after a crash
+    OUTBOX_RETRY_BASE: int = 30  # seconds, doubled per failed attempt
+    OUTBOX_RETRY_MAX: int = 3600
+
+    # Scraper cron schedule (minutes; must divide an hour or a day)
+    SCRAPER_INTERVAL_MINUTES: int = 60
+    CTFTIME_INTERVAL_MINUTES: Optional[int] = None  # defaults to the above
+    RSS_INTERVAL_MINUTES: Optional[int] = None
+    SCRAPER_JITTER_SECONDS: int = 120  # random delay before each scheduled run
+    SCRAPER_LOCK_TIMEOUT: int = 900  # per-source run lock; outlives the job timeout
 
     model_config = SettingsConfigDict(
         env_file=".env", case_sensitive=True, extra="ignore"
@@ -0,0 +1,159 @@
+import asyncio
+import functools
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram
+from prometheus_client import generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+# Sub-millisecond to a few seconds: API routes, DB queries, pool waits
+FAST_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)  # fmt: skip
+# Outbound calls and whole jobs
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 180.0, 600.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "API request latency by route template",
+    ["method", "route", "status"],
+    buckets=FAST_BUCKETS,
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time by operation",
+    ["operation"],
+    buckets=FAST_BUCKETS,
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds",
+    "Time spent waiting for a pooled DB connection",
+    buckets=FAST_BUCKETS,
+)
+SCRAPER_FETCH_SECONDS = Histogram(
+    "scraper_fetch_duration_seconds",
+    "Scraper HTTP request latency (per attempt)",
+    ["source"],
+    buckets=SLOW_BUCKETS,
+)
+SCRAPER_FETCH_BYTES = Counter(
+    "scraper_fetch_bytes", "Response bytes downloaded by scrapers", ["source"]
+)
+SCRAPER_FETCH_RESPONSES = Counter(
+    "scraper_fetch_responses",
+    "Scraper HTTP attempts by status code ('error' for transport failures)",
+    ["source", "status"],
+)
+JOB_SECONDS = Histogram(
+    "arq_job_duration_seconds", "ARQ job run time", ["job"], buckets=SLOW_BUCKETS
+)
+JOB_RUNS = Counter("arq_job_runs", "ARQ job runs by outcome", ["job", "outcome"])
+TELEGRAM_SEND_SECONDS = Histogram(
+    "telegram_send_duration_seconds",
+    "Telegram sendMessage latency",
+    buckets=SLOW_BUCKETS,
+)
+TELEGRAM_SEND_ERRORS = Counter(
+    "telegram_send_errors", "Failed Telegram sends by reason", ["reason"]
+)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing each HTTP request (streamed bodies included).
+    Labels use the matched route template, so cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_REQUEST_SECONDS.labels(scope["method"], route, status).observe(
+                time.perf_counter() - started
+            )
+
+
+def track_job(func):
+    """
+    Record duration and outcome (success/failure/cancelled/skipped) of an ARQ
+    job. Jobs report a skipped run by returning {"skipped": reason}.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(ctx, *args, **kwargs):
+        outcome = "failure"
+        started = time.perf_counter()
+        try:
+            result = await func(ctx, *args, **kwargs)
+            skipped = isinstance(result, dict) and "skipped" in result
+            outcome = "skipped" if skipped else "success"
+            return result
+        except asyncio.CancelledError:
+            # ARQ cancels jobs that exceed job_timeout
+            outcome = "cancelled"
+            raise
+        finally:
+            JOB_SECONDS.labels(func.__name__).observe(time.perf_counter() - started)
+            JOB_RUNS.labels(func.__name__, outcome).inc()
+
+    return wrapper
+
+
+class AppStatsCollector(Collector):
+    """Exports counters the app already keeps in-process, read at scrape time."""
+
+    def describe(self):
+        # Registration must not import the DB/cache modules (they import us)
+        return []
+
+    def collect(self):
+        from src.app.db.session import pool_stats
+        from src.app.services.cache import response_cache_stats
+
+        cache = CounterMetricFamily(
+            "response_cache_requests",
+            "Events API response cache lookups by outcome",
+            labels=["route", "outcome"],
+        )
+        for (route, outcome), count in response_cache_stats.items():
+            cache.add_metric([route, outcome], count)
+        yield cache
+
+        yield GaugeMetricFamily(
+            "db_pool_in_use", "DB connections checked out", value=pool_stats.in_use
+        )
+        yield GaugeMetricFamily(
+            "db_pool_overflow",
+            "DB connections open beyond DB_POOL_SIZE",
+            value=pool_stats.overflow,
+        )
+        yield CounterMetricFamily(
+            "db_pool_checkout_timeouts",
+            "Checkouts that gave up after DB_POOL_TIMEOUT",
+            value=pool_stats.checkout_timeouts,
+        )
+
+
+REGISTRY.register(AppStatsCollector())
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """(body, content type) in the Prometheus text exposition format."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
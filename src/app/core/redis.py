@@ -0,0 +1,29 @@
+import asyncio
+from typing import Optional
+
+from redis import asyncio as aioredis
+
+from src.app.core.config import settings
+
+# One pooled client per event loop (the API and each worker run a single loop)
+_client: Optional[aioredis.Redis] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_redis() -> aioredis.Redis:
+    """Shared, pooled async Redis client for the running event loop."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = aioredis.from_url(
+            f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}"
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_redis():
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+    _client = _client_loop = None
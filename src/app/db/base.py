@@ -1,3 +1,3 @@
 # Import all models here for Alembic autogenerate
 from src.app.db.session import Base  # noqa: F401
-from src.app.db.models import Event  # noqa: F401
+from src.app.db.models import Event, NotificationOutbox, Subscription  # noqa: F401
@@ -1,14 +1,42 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import String, DateTime, Float, Integer
+from sqlalchemy import (
+    DDL,
+    Boolean,
+    Computed,
+    String,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    Index,
+    UniqueConstraint,
+    event,
+    func,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
 
 from src.app.db.session import Base
 
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        # Serves tags && / @> filters on the events API and ICS feeds
+        Index("ix_events_tags", "tags", postgresql_using="gin"),
+        # Keyset pagination order for /api/events
+        Index("ix_events_start_time_id", "start_time", "id"),
+        # /api/events/search: ranked full-text and fuzzy title matching
+        Index("ix_events_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_events_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
 
@@ -23,21 +51,109 @@ class Event(Base):
         String, default="ctf", index=True
     )  # ctf, conference
     format: Mapped[Optional[str]] = mapped_column(
-        String, nullable=True
+        String, nullable=True, index=True
     )  # Jeopardy, Attack-Defense
+    # Normalized (lowercase, sorted) tags from AIService; mirrors meta["tags"]
+    tags: Mapped[list[str]] = mapped_column(
+        ARRAY(String), default=list, server_default="{}"
+    )
 
     # Timing (UTC)
     start_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
     end_time: Mapped[datetime] = mapped_column(DateTime(timezone=True))
 
     # Metadata
-    weight: Mapped[float] = mapped_column(Float, default=0.0)
+    weight: Mapped[float] = mapped_column(Float, default=0.0, index=True)
     source_id: Mapped[str] = mapped_column(
         String, unique=True, index=True
     )  # e.g. ctftime_123
+    # sha256 of the normalized payload; unchanged rows are skipped on sync
+    fingerprint: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
 
     # Flexible Storage (Raw Payload + Extra Fields)
     meta: Mapped[dict] = mapped_column(JSONB, default=dict)
 
+    # Weighted title (A) + description (B) document, kept current by Postgres
+    # on every scraper insert/upsert; never loaded with the row.
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+
     def __repr__(self):
         return f"<Event {self.title} ({self.start_time})>"
+
+
+class NotificationOutbox(Base):
+    """
+    One pending alert per (chat, event), written in the same transaction as
+    the event upsert and delivered later by the deliver_notifications job.
+    """
+
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        # Re-queuing the same alert is a no-op (ON CONFLICT DO NOTHING)
+        UniqueConstraint("chat_id", "event_id", name="uq_outbox_chat_event"),
+        # The drain only ever scans due, pending rows
+        Index(
+            "ix_outbox_pending_due",
+            "available_at",
+            "id",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    chat_id: Mapped[str] = mapped_column(String, nullable=False)
+    event_id: Mapped[int] = mapped_column(
+        ForeignKey("events.id", ondelete="CASCADE"), index=True
+    )
+    status: Mapped[str] = mapped_column(
+        String(16), default="pending", server_default="pending"
+    )  # pending, sent, failed
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    # Next attempt (retry backoff) or end of the current delivery lease
+    available_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    sent_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    last_error: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+
+
+class Subscription(Base):
+    """
+    A chat's alert rule. Every set field must match; empty tags match any
+    event, otherwise at least one tag must be shared.
+    """
+
+    __tablename__ = "subscriptions"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    chat_id: Mapped[str] = mapped_column(String, nullable=False, index=True)
+    # Normalized like Event.tags
+    tags: Mapped[list[str]] = mapped_column(
+        ARRAY(String), default=list, server_default="{}"
+    )
+    type: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    format: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    min_weight: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    active: Mapped[bool] = mapped_column(Boolean, default=True, server_default="true")
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+
+# gin_trgm_ops (fuzzy title search) lives in the pg_trgm extension
+event.listen(
+    Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+)
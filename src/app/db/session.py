@@ -1,14 +1,126 @@
+import time
+import uuid
+
+from sqlalchemy import event, exc
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from src.app.core.config import settings
+from src.app.core.metrics import DB_POOL_CHECKOUT_SECONDS, DB_QUERY_SECONDS
+
+
+class PoolStats:
+    """Pool counters for sizing DB_POOL_SIZE / DB_MAX_OVERFLOW from real traffic."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.checkout_seconds = 0.0
+        self.checkout_max_seconds = 0.0
+        self.checkout_timeouts = 0
+        self.in_use = 0
+        self.overflow = 0
+
+    def observe_checkout(self, seconds: float):
+        DB_POOL_CHECKOUT_SECONDS.observe(seconds)
+        self.checkouts += 1
+        self.checkout_seconds += seconds
+        self.checkout_max_seconds = max(self.checkout_max_seconds, seconds)
+
+    def summary(self) -> dict:
+        return {
+            "checkouts": self.checkouts,
+            "checkout_avg_ms": round(1000 * self.checkout_seconds / self.checkouts, 3)
+            if self.checkouts
+            else 0.0,
+            "checkout_max_ms": round(1000 * self.checkout_max_seconds, 3),
+            "checkout_timeouts": self.checkout_timeouts,
+            "in_use": self.in_use,
+            "overflow": self.overflow,
+        }
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that times how long callers wait for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.checkout_timeouts += 1
+            raise
+        finally:
+            pool_stats.observe_checkout(time.perf_counter() - started)
+
+
+def engine_options() -> dict:
+    """create_async_engine kwargs for the configured pool profile."""
+    connect_args = {
+        # asyncpg's own per-connection statement cache
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        # SQLAlchemy's prepared statement cache on top of it
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+    if settings.DB_PGBOUNCER:
+        # Transaction pooling hands each transaction any server connection:
+        # named prepared statements must be neither cached nor reused
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = (
+            lambda: f"__asyncpg_{uuid.uuid4()}__"
+        )
+
+    return {
+        "echo": settings.DB_ECHO,
+        "future": True,
+        "poolclass": InstrumentedPool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "connect_args": connect_args,
+    }
+
 
 # Create Async Engine
-engine = create_async_engine(
-    str(settings.DATABASE_URI),
-    echo=True,  # Set to False in production
-    future=True,
-)
+engine = create_async_engine(str(settings.DATABASE_URI), **engine_options())
+
+
+@event.listens_for(engine.sync_engine.pool, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    pool_stats.in_use += 1
+    pool_stats.overflow = max(engine.sync_engine.pool.overflow(), 0)
+
+
+@event.listens_for(engine.sync_engine.pool, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    pool_stats.in_use = max(pool_stats.in_use - 1, 0)
+    pool_stats.overflow = max(engine.sync_engine.pool.overflow(), 0)
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement else "?"
+    DB_QUERY_SECONDS.labels(operation).observe(elapsed)
+
+
+@event.listens_for(engine.sync_engine, "handle_error")
+def _on_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
 
 # Async Session Factory
 AsyncSessionLocal = async_sessionmaker(
@@ -0,0 +1,39 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class EventSummary(BaseModel):
+    """Row of /api/events/ (list views never carry description or meta)."""
+
+    id: int
+    title: str
+    start_time: datetime
+    end_time: datetime
+    type: str
+    format: Optional[str] = None
+    weight: float
+    url: str
+    logo: Optional[str] = None
+    tags: List[str] = []
+
+
+class EventSearchHit(EventSummary):
+    """Row of /api/events/search, best match first."""
+
+    score: float
+
+
+class EventDetail(BaseModel):
+    """Full event as returned by /api/events/{event_id}."""
+
+    id: int
+    title: str
+    description: Optional[str] = None
+    raw_metadata: Optional[dict] = None
+    start_time: datetime
+    end_time: datetime
+    url: str
+    type: str
+    format: Optional[str] = None
@@ -1,35 +1,229 @@
+import asyncio
+import hashlib
+import json
 import logging
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.app.core.config import settings
+from src.app.core.redis import get_redis
 
 logger = logging.getLogger(__name__)
 
 
+class KeywordMatcher:
+    """
+    Single-pass keyword tagger. All terms are compiled into one alternation
+    regex, bounded by non-word lookarounds (so "c++" works), with one named
+    group per term: a hit resolves to its categories via `lastgroup`.
+    A trailing '*' makes a term a prefix match ("stegano*" -> "steganography").
+    """
+
+    def __init__(self, keywords: Dict[str, List[str]]):
+        self.exact: Dict[str, set] = {}
+        self.prefixes: Dict[str, set] = {}
+        for category, words in keywords.items():
+            for word in words:
+                term = " ".join(word.lower().split())
+                if term.endswith("*"):
+                    self.prefixes.setdefault(term[:-1], set()).add(category)
+                else:
+                    self.exact.setdefault(term, set()).add(category)
+
+        # Longest first so "machine learning" wins over "machine"
+        terms = [(t, False) for t in self.exact] + [(t, True) for t in self.prefixes]
+        terms.sort(key=lambda tp: len(tp[0]), reverse=True)
+
+        # Only the winning term is reported per hit, so each term also carries
+        # the categories of every prefix term it starts with
+        self.groups: Dict[str, frozenset] = {}
+        patterns = []
+        for i, (term, is_prefix) in enumerate(terms):
+            categories = set() if is_prefix else set(self.exact[term])
+            for prefix, prefix_categories in self.prefixes.items():
+                if term.startswith(prefix):
+                    categories |= prefix_categories
+            name = f"t{i}"
+            self.groups[name] = frozenset(categories)
+            tail = r"\w*" if is_prefix else ""
+            patterns.append(f"(?P<{name}>{self._pattern(term)}{tail})")
+        self.regex = re.compile(
+            rf"(?<!\w)(?:{'|'.join(patterns)})(?!\w)", re.IGNORECASE
+        )
+
+    @staticmethod
+    def _pattern(term: str) -> str:
+        # Any run of whitespace matches the space in multi-word terms
+        return r"\s+".join(re.escape(part) for part in term.split())
+
+    def match(self, text: str) -> List[str]:
+        tags = set()
+        for hit in self.regex.finditer(text):
+            tags |= self.groups[hit.lastgroup]
+        # Sorted so the output (and Event fingerprints) is deterministic
+        return sorted(tags)
+
+
+def load_keywords(default: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Taxonomy from TAG_KEYWORDS_FILE (JSON: {category: [terms]}) or the default."""
+    if not settings.TAG_KEYWORDS_FILE:
+        return default
+    with open(settings.TAG_KEYWORDS_FILE, encoding="utf-8") as f:
+        keywords = json.load(f)
+    logger.info(
+        f"Loaded {len(keywords)} tag categories from {settings.TAG_KEYWORDS_FILE}"
+    )
+    return keywords
+
+
+class TaggingBackend(ABC):
+    """
+    Interface for model-backed taggers. Implementations receive a whole batch
+    of (title, description) pairs and return one tag list per pair.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def tag_batch(self, items: List[Tuple[str, str]]) -> List[List[str]]:
+        ...
+
+
+class LocalTaggingBackend(TaggingBackend):
+    """Offline stand-in for an LLM: the keyword matcher plus simulated latency."""
+
+    name = "local"
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    async def tag_batch(self, items: List[Tuple[str, str]]) -> List[List[str]]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return AIService.generate_tags_batch(items)
+
+
+BACKENDS = {"local": LocalTaggingBackend}
+
+
+def build_backend(name: Optional[str]) -> Optional[TaggingBackend]:
+    if not name:
+        return None
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown TAG_BACKEND {name!r}, expected one of {list(BACKENDS)}"
+        )
+    return BACKENDS[name]()
+
+
 class AIService:
     # Basic Keywords for Heuristic "AI"
     KEYWORDS = {
         "web": ["xss", "csrf", "injection", "web", "frontend", "http"],
-        "crypto": ["crypto", "cryptography", "rsa", "aes", "encryption"],
+        "crypto": ["crypto*", "rsa", "aes", "encryption"],
         "pwn": ["pwn", "overflow", "rop", "heap", "binary", "exploit"],
-        "forensics": ["forensics", "stegano", "pcap", "network analysis"],
+        "forensics": ["forensics", "stegano*", "pcap", "network analysis"],
         "cloud": ["aws", "azure", "gcp", "cloud", "kubernetes", "docker"],
         "ml": ["machine learning", "adversarial", "ai", "model"],
     }
+    # Compiled once at import; see KeywordMatcher
+    matcher = KeywordMatcher(load_keywords(KEYWORDS))
+
+    # Optional model-backed tagger (TAG_BACKEND); None means heuristics only
+    backend: Optional[TaggingBackend] = build_backend(settings.TAG_BACKEND)
+    CACHE_KEY = "tags:{backend}:{digest}"
 
     @classmethod
     async def generate_tags(cls, title: str, description: str) -> list:
+        """Generate tags for an event based on its content."""
+        return (await cls.tag_batch([(title, description)]))[0]
+
+    @classmethod
+    async def tag_batch(cls, items: Iterable[Tuple[str, str]]) -> List[list]:
         """
-        Generate tags for an event based on its content.
-        TODO: Integrate OpenAI/Gemini API here for advanced tagging.
+        Tag many (title, description) pairs: heuristics for all of them, merged
+        with the backend's tags. Backend results are cached in Redis by content
+        digest, so unchanged events are never sent to the model twice.
         """
-        text = (title + " " + description).lower()
-        tags = set()
+        items = list(items)
+        tags = cls.generate_tags_batch(items)
+        if cls.backend is None or not items:
+            return tags
+
+        backend_tags = await cls._backend_tags(items)
+        return [
+            sorted(set(heuristic) | set(extra or []))
+            for heuristic, extra in zip(tags, backend_tags)
+        ]
+
+    @classmethod
+    async def _backend_tags(cls, items: List[Tuple[str, str]]) -> List[Optional[list]]:
+        """Backend tags per item; None where the backend failed or timed out."""
+        redis = get_redis()
+        keys = [
+            cls.CACHE_KEY.format(
+                backend=cls.backend.name, digest=_content_digest(title, description)
+            )
+            for title, description in items
+        ]
+        try:
+            cached = await redis.mget(keys)
+        except Exception as e:
+            # Cache is an optimization: without it, every item goes to the backend
+            logger.warning(f"Tag cache unavailable: {e!r}")
+            redis, cached = None, [None] * len(keys)
+        results = [json.loads(c) if c is not None else None for c in cached]
+
+        misses = [i for i, result in enumerate(results) if result is None]
+        semaphore = asyncio.Semaphore(settings.TAG_BACKEND_CONCURRENCY)
 
-        # 1. Heuristic Check
-        for category, words in cls.KEYWORDS.items():
-            if any(word in text for word in words):
-                tags.add(category)
+        async def _run(batch: List[int]):
+            async with semaphore:
+                try:
+                    tagged = await asyncio.wait_for(
+                        cls.backend.tag_batch([items[i] for i in batch]),
+                        timeout=settings.TAG_BACKEND_TIMEOUT,
+                    )
+                except Exception as e:
+                    # Heuristic tags still apply; nothing is cached so we retry later
+                    logger.warning(
+                        f"Tagging backend failed for {len(batch)} items: {e!r}"
+                    )
+                    return
+            if len(tagged) != len(batch):
+                logger.warning(
+                    f"Tagging backend returned {len(tagged)} results "
+                    f"for {len(batch)} items, ignoring them"
+                )
+                return
+
+            for i, item_tags in zip(batch, tagged):
+                results[i] = sorted(item_tags)
+            if redis is None:
+                return
+            try:
+                async with redis.pipeline(transaction=False) as pipe:
+                    for i in batch:
+                        pipe.set(
+                            keys[i], json.dumps(results[i]), ex=settings.TAG_CACHE_TTL
+                        )
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Could not cache backend tags: {e!r}")
+
+        size = settings.TAG_BACKEND_BATCH_SIZE
+        await asyncio.gather(
+            *(_run(misses[i : i + size]) for i in range(0, len(misses), size))
+        )
+        return results
+
+    @classmethod
+    def generate_tags_batch(cls, items: Iterable[Tuple[str, str]]) -> List[list]:
+        """Heuristic tags for many (title, description) pairs in one call."""
+        match = cls.matcher.match
+        return [match(f"{title} {description or ''}") for title, description in items]
 
-        # 2. LLM Placeholder (If Key exists)
-        # if settings.OPENAI_API_KEY:
-        #    tags.update(await cls.call_llm(text))
 
-        return list(tags)
+def _content_digest(title: str, description: Optional[str]) -> str:
+    return hashlib.sha256(f"{title}\0{description or ''}".encode("utf-8")).hexdigest()
@@ -0,0 +1,99 @@
+import json
+import logging
+import time
+from collections import Counter
+from typing import NamedTuple, Optional
+
+from src.app.core.config import settings
+from src.app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Bumped by ingest jobs after they commit changes; caches key off it
+DATA_VERSION_KEY = "events:data_version"
+# Unix time of the latest bump: the Last-Modified of event-derived responses
+DATA_CHANGED_KEY = "events:data_changed_at"
+# Carries each new version to API processes holding in-memory snapshots
+CHANGES_CHANNEL = "events:changed"
+
+# Read-through API responses; a version bump orphans every entry at once
+RESPONSE_KEY = "api:{route}:{version}:{params}"
+
+# Per-process response cache outcomes, keyed (route, "hit" | "miss" | "error")
+response_cache_stats: Counter = Counter()
+
+
+class DataState(NamedTuple):
+    version: int
+    changed_at: Optional[int]  # None until the first bump
+
+
+async def get_data_version() -> int:
+    value = await get_redis().get(DATA_VERSION_KEY)
+    return int(value) if value is not None else 0
+
+
+async def get_data_state() -> DataState:
+    version, changed_at = await get_redis().mget(DATA_VERSION_KEY, DATA_CHANGED_KEY)
+    return DataState(
+        int(version) if version is not None else 0,
+        int(changed_at) if changed_at is not None else None,
+    )
+
+
+async def bump_data_version() -> int:
+    """Invalidate every event-derived cache in one step (call after commit)."""
+    redis = get_redis()
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.incr(DATA_VERSION_KEY)
+        pipe.set(DATA_CHANGED_KEY, int(time.time()))
+        version, _ = await pipe.execute()
+    await redis.publish(CHANGES_CHANNEL, version)
+    logger.info(f"Event data version bumped to {version}")
+    return version
+
+
+async def get_cached_response(
+    route: str, params: str
+) -> tuple[Optional[tuple[bytes, dict]], Optional[int]]:
+    """
+    ((body, headers), data version) for a cached response, or (None, version)
+    on a miss. Version is None when Redis is unavailable: serve uncached.
+    """
+    try:
+        version = await get_data_version()
+        cached = await get_redis().hgetall(
+            RESPONSE_KEY.format(route=route, version=version, params=params)
+        )
+    except Exception as e:
+        logger.error(f"Response cache unavailable for {route}: {e}")
+        response_cache_stats[route, "error"] += 1
+        return None, None
+
+    if not cached:
+        response_cache_stats[route, "miss"] += 1
+        return None, version
+
+    response_cache_stats[route, "hit"] += 1
+    return (cached[b"body"], json.loads(cached[b"headers"])), version
+
+
+async def store_response(
+    route: str, params: str, version: int, body: bytes, headers: dict
+):
+    redis_key = RESPONSE_KEY.format(route=route, version=version, params=params)
+    try:
+        async with get_redis().pipeline(transaction=True) as pipe:
+            pipe.hset(redis_key, mapping={"body": body, "headers": json.dumps(headers)})
+            pipe.expire(redis_key, settings.EVENTS_CACHE_TTL)
+            await pipe.execute()
+    except Exception as e:
+        logger.error(f"Failed to cache {route} response: {e}")
+
+
+def response_cache_summary() -> dict:
+    """{route: {"hit": n, "miss": n, "error": n}} for this process."""
+    summary: dict = {}
+    for (route, outcome), count in response_cache_stats.items():
+        summary.setdefault(route, {"hit": 0, "miss": 0, "error": 0})[outcome] = count
+    return summary
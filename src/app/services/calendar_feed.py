@@ -0,0 +1,344 @@
+import json
+import logging
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from typing import AsyncIterator, Optional
+
+from ics import Calendar, Event as IcsEvent
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from src.app.core.config import settings
+from src.app.core.redis import get_redis
+from src.app.db.models import Event
+from src.app.services.cache import DataState, get_data_state
+from src.app.services.event_filters import EventFilters
+
+logger = logging.getLogger(__name__)
+
+FEED_KEY = "calendar:ctf.ics:{filters}:{version}"
+# Distinct filter combinations kept in the in-process cache
+LOCAL_FEEDS = 64
+
+
+def feed_validators(state: DataState) -> dict:
+    """
+    ETag/Last-Modified for a data version. They are known before rendering, so
+    a streamed miss carries them too. Weak: DTSTAMP differs between renders.
+    """
+    headers = {"ETag": f'W/"ics-{state.version}"'}
+    if state.changed_at is not None:
+        headers["Last-Modified"] = formatdate(state.changed_at, usegmt=True)
+    return headers
+
+
+def not_modified(
+    validators: dict, if_none_match: Optional[str], if_modified_since: Optional[str]
+) -> bool:
+    """Evaluate conditional request headers (If-None-Match takes precedence)."""
+    if if_none_match is not None:
+        if "ETag" not in validators:
+            return False
+        etag = validators["ETag"].removeprefix("W/")
+        tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if if_modified_since is not None and "Last-Modified" in validators:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return parsedate_to_datetime(validators["Last-Modified"]) <= since
+    return False
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip, honouring q-values."""
+    codings = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[coding.strip().lower()] = q
+    if "gzip" in codings:
+        return codings["gzip"] > 0
+    return codings.get("*", 0) > 0
+
+
+class RenderedFeed:
+    """A rendered ICS document plus the validators clients poll with."""
+
+    def __init__(
+        self,
+        body: bytes,
+        gzipped: bytes,
+        version: int,
+        validators: dict,
+        rendered_at: float,
+    ):
+        self.body = body
+        self.gzipped = gzipped
+        self.version = version
+        self.validators = validators
+        self.rendered_at = rendered_at
+
+    def is_fresh(self, version: int) -> bool:
+        return (
+            self.version == version
+            and time.time() - self.rendered_at < settings.CALENDAR_CACHE_TTL
+        )
+
+
+# Only what a VEVENT emits: never the meta JSONB or the search_vector
+ICS_COLUMNS = (
+    Event.source_id,
+    Event.type,
+    Event.title,
+    Event.description,
+    Event.url,
+    Event.format,
+    Event.weight,
+    Event.start_time,
+    Event.end_time,
+)
+
+
+def _upcoming_query(filters: Optional[EventFilters] = None):
+    query = (
+        select(*ICS_COLUMNS)
+        .where(Event.start_time > datetime.now(timezone.utc))
+        .order_by(Event.start_time.asc())
+    )
+    return filters.apply(query) if filters is not None else query
+
+
+async def render_calendar_ics(
+    db: AsyncSession, filters: Optional[EventFilters] = None
+) -> bytes:
+    """
+    Render all upcoming events with the `ics` object model.
+    Superseded by `stream_calendar`; kept as the baseline for benchmarks.
+    """
+    result = await db.execute(_upcoming_query(filters))
+    db_events = result.all()
+
+    cal = Calendar()
+    cal.creator = "CTF Tracker MVP"
+
+    for e in db_events:
+        c = IcsEvent()
+        c.name = f"[{e.type.upper()}] {e.title}"
+        c.begin = e.start_time
+        c.end = e.end_time
+        c.description = (
+            f"{e.description}\n\nFormat: {e.format}\nWeight: {e.weight}\n\nURL: {e.url}"
+        )
+        c.url = e.url
+        c.location = e.format if e.format else "Online"
+
+        cal.events.add(c)
+
+    return str(cal).encode("utf-8")
+
+
+# RFC 5545 text escaping (3.3.11); CR is dropped, LF becomes a literal "\n"
+_ICS_ESCAPES = str.maketrans(
+    {"\\": "\\\\", ";": "\\;", ",": "\\,", "\n": "\\n", "\r": None}
+)
+
+
+def escape_text(value) -> str:
+    return str(value if value is not None else "").translate(_ICS_ESCAPES)
+
+
+def fold_line(line: str) -> str:
+    """Fold a content line at 75 octets without splitting UTF-8 sequences (3.1)."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+
+    parts = []
+    start, limit = 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Step back off UTF-8 continuation bytes
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode("utf-8"))
+        start, limit = end, 74  # continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _ics_datetime(value: datetime) -> str:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+
+def render_vevent(e: Row, dtstamp: str) -> str:
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{escape_text(e.source_id)}@ctf-tracker",
+        f"DTSTAMP:{dtstamp}",
+        f"DTSTART:{_ics_datetime(e.start_time)}",
+        f"DTEND:{_ics_datetime(e.end_time)}",
+        f"SUMMARY:{escape_text(f'[{e.type.upper()}] {e.title}')}",
+        "DESCRIPTION:"
+        + escape_text(
+            f"{e.description or ''}\n\nFormat: {e.format}\nWeight: {e.weight}\n\nURL: {e.url}"
+        ),
+        f"LOCATION:{escape_text(e.format or 'Online')}",
+        f"URL:{e.url}",
+        "END:VEVENT",
+    ]
+    return "".join(fold_line(line) for line in lines)
+
+
+async def stream_calendar(
+    db: AsyncSession, filters: Optional[EventFilters] = None
+) -> AsyncIterator[bytes]:
+    """
+    Render upcoming events straight from a server-side cursor, emitting
+    VEVENT blocks in ~64KB chunks, so memory stays flat for any calendar size.
+    """
+    dtstamp = _ics_datetime(datetime.now(timezone.utc))
+    buffer = [
+        "BEGIN:VCALENDAR\r\n",
+        "VERSION:2.0\r\n",
+        "PRODID:CTF Tracker MVP\r\n",
+        "CALSCALE:GREGORIAN\r\n",
+    ]
+    size = 0
+
+    query = _upcoming_query(filters).execution_options(
+        yield_per=settings.CALENDAR_STREAM_BATCH
+    )
+    async for e in await db.stream(query):
+        block = render_vevent(e, dtstamp)
+        buffer.append(block)
+        size += len(block)
+        if size >= 64 * 1024:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+
+    buffer.append("END:VCALENDAR\r\n")
+    yield "".join(buffer).encode("utf-8")
+
+
+async def render_calendar(
+    db: AsyncSession, filters: Optional[EventFilters] = None
+) -> bytes:
+    return b"".join([chunk async for chunk in stream_calendar(db, filters)])
+
+
+# In-process copies (LRU by filter set), so most polls never leave the process
+_local: "OrderedDict[str, RenderedFeed]" = OrderedDict()
+
+
+def _remember_local(key: str, feed: RenderedFeed):
+    _local[key] = feed
+    _local.move_to_end(key)
+    while len(_local) > LOCAL_FEEDS:
+        _local.popitem(last=False)
+
+
+async def get_cached_feed(
+    filters: EventFilters,
+) -> tuple[Optional[RenderedFeed], Optional[DataState]]:
+    """
+    (feed, data state): the in-process copy, else the Redis copy, for the
+    current data version. Feed is None on a miss; state is None if Redis is down.
+    Ingest jobs bump the version, which invalidates both copies.
+    """
+    key = filters.cache_key()
+    try:
+        state = await get_data_state()
+        local = _local.get(key)
+        if local is not None and local.is_fresh(state.version):
+            return local, state
+
+        redis_key = FEED_KEY.format(filters=key, version=state.version)
+        async with get_redis().pipeline(transaction=True) as pipe:
+            pipe.hgetall(redis_key)
+            pipe.get(f"{redis_key}:body")
+            pipe.get(f"{redis_key}:gzip")
+            meta, body, gzipped = await pipe.execute()
+    except Exception as e:
+        logger.error(f"Calendar cache unavailable, rendering directly: {e}")
+        return None, None
+
+    if meta and body is not None and gzipped is not None:
+        feed = RenderedFeed(
+            body,
+            gzipped,
+            state.version,
+            json.loads(meta[b"validators"]),
+            float(meta[b"rendered_at"]),
+        )
+        if feed.is_fresh(state.version):
+            _remember_local(key, feed)
+            return feed, state
+
+    return None, state
+
+
+async def stream_and_cache(
+    db: AsyncSession, filters: EventFilters, state: Optional[DataState]
+) -> AsyncIterator[bytes]:
+    """
+    Stream the feed to the client while appending each chunk (and its gzip
+    output) to temporary Redis keys, renamed into place once complete, so
+    memory stays flat on a miss too.
+    """
+    # No data state means Redis is unavailable: stream without caching
+    caching = state is not None
+    if caching:
+        redis = get_redis()
+        ttl = settings.CALENDAR_CACHE_TTL
+        redis_key = FEED_KEY.format(filters=filters.cache_key(), version=state.version)
+        tmp = f"{redis_key}:tmp:{uuid.uuid4().hex}"
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip
+
+    async for chunk in stream_calendar(db, filters):
+        yield chunk
+        if not caching:
+            continue
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.append(f"{tmp}:body", chunk)
+                pipe.append(f"{tmp}:gzip", compressor.compress(chunk))
+                # Left behind (and expired) if the client goes away mid-stream
+                pipe.expire(f"{tmp}:body", ttl)
+                pipe.expire(f"{tmp}:gzip", ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to cache calendar feed: {e}")
+            caching = False
+
+    if not caching:
+        return
+    meta = {
+        "validators": json.dumps(feed_validators(state)),
+        "rendered_at": time.time(),
+    }
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.append(f"{tmp}:gzip", compressor.flush())
+            pipe.rename(f"{tmp}:body", f"{redis_key}:body")
+            pipe.rename(f"{tmp}:gzip", f"{redis_key}:gzip")
+            pipe.hset(redis_key, mapping=meta)
+            for key in (redis_key, f"{redis_key}:body", f"{redis_key}:gzip"):
+                pipe.expire(key, ttl)
+            await pipe.execute()
+    except Exception as e:
+        logger.error(f"Failed to cache calendar feed: {e}")
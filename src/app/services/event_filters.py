@@ -0,0 +1,106 @@
+from typing import Iterable, List, Optional
+
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.app.db.models import Event
+
+# Same normalization as normalize_tags, done in SQL for rows tagged before
+# the column existed (CTFtime kept its tags in meta)
+TAGS_FROM_META = text(
+    """
+    UPDATE events SET tags = ARRAY(
+        SELECT DISTINCT lower(btrim(tag))
+        FROM jsonb_array_elements_text(meta->'tags') AS tag
+        WHERE btrim(tag) <> ''
+        ORDER BY 1
+    )
+    WHERE tags = '{}' AND jsonb_typeof(meta->'tags') = 'array'
+    """
+)
+
+
+def normalize_tags(tags: Optional[Iterable[str]]) -> List[str]:
+    """Lowercase, strip, dedupe and sort tags (same form as Event.tags)."""
+    return sorted({t.strip().lower() for t in tags or [] if t and t.strip()})
+
+
+class EventFilters:
+    """
+    Tag/format/weight/type filters shared by the events API and ICS feeds.
+    Tag filters use the GIN-indexed Event.tags array (&& for any, @> for all).
+    """
+
+    def __init__(
+        self,
+        type: Optional[str] = None,
+        tags: Optional[Iterable[str]] = None,
+        match_all: bool = False,
+        format: Optional[str] = None,
+        min_weight: Optional[float] = None,
+    ):
+        self.type = type
+        self.tags = normalize_tags(tags)
+        self.match_all = match_all
+        self.format = format
+        self.min_weight = min_weight
+
+    def apply(self, query):
+        if self.type:
+            query = query.where(Event.type == self.type)
+        if self.tags:
+            if self.match_all:
+                query = query.where(Event.tags.contains(self.tags))
+            else:
+                query = query.where(Event.tags.overlap(self.tags))
+        if self.format:
+            query = query.where(Event.format == self.format)
+        if self.min_weight is not None:
+            query = query.where(Event.weight >= self.min_weight)
+        return query
+
+    def cache_key(self) -> str:
+        """Canonical string form, so equivalent filters share cache entries."""
+        return (
+            f"type={self.type or ''}&tags={','.join(self.tags)}"
+            f"&match={'all' if self.match_all else 'any'}"
+            f"&format={self.format or ''}"
+            f"&min_weight={'' if self.min_weight is None else self.min_weight}"
+        )
+
+
+async def backfill_tags(session: AsyncSession, batch_size: int = 500) -> dict:
+    """
+    One-off fill of Event.tags for rows saved before the column existed: from
+    meta["tags"] where present, else by tagging title and description (RSS
+    rows are insert-only, so ingest never revisits them).
+    """
+    from src.app.services.ai import AIService
+
+    result = await session.execute(TAGS_FROM_META)
+    stats = {"from_meta": result.rowcount, "retagged": 0}
+    await session.commit()
+
+    last_id = 0
+    while True:
+        result = await session.execute(
+            select(Event.id, Event.title, Event.description)
+            .where(Event.tags == [], Event.id > last_id)
+            .order_by(Event.id)
+            .limit(batch_size)
+        )
+        rows = result.all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        all_tags = await AIService.tag_batch((r.title, r.description) for r in rows)
+        changes = [
+            {"id": row.id, "tags": normalize_tags(tags)}
+            for row, tags in zip(rows, all_tags)
+            if tags
+        ]
+        if changes:
+            await session.execute(update(Event), changes)
+            stats["retagged"] += len(changes)
+        await session.commit()
+    return stats
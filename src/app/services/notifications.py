@@ -1,63 +1,261 @@
+import asyncio
+import html
 import httpx
 import logging
-from typing import List
+import random
+import time
+from typing import List, Optional, Tuple
 from src.app.core.config import settings
+from src.app.core.metrics import TELEGRAM_SEND_ERRORS, TELEGRAM_SEND_SECONDS
 from src.app.db.models import Event
 
 logger = logging.getLogger(__name__)
 
+# Telegram rejects message texts longer than this
+MAX_MESSAGE_LENGTH = 4096
+# Keep every digest line well under the message limit
+MAX_TITLE_LENGTH = 200
+MAX_URL_LENGTH = 1024
+
+
+class TokenBucket:
+    """
+    `rate` tokens per second, bursting up to `capacity`. Single event loop only:
+    the check-and-take in `acquire` never spans an await.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError(f"Token bucket rate must be positive, got {rate}")
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.resume_at = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            if now < self.resume_at:
+                await asyncio.sleep(self.resume_at - now)
+                continue
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """Hold every caller for `seconds` (Telegram's 429 retry_after)."""
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens = 0
+        self.updated = now
+        self.resume_at = max(self.resume_at, now + seconds)
+
+    def idle(self) -> bool:
+        self._refill(time.monotonic())
+        return self.tokens >= self.capacity and time.monotonic() >= self.resume_at
+
+
+class RateLimiter:
+    """Telegram's bot limits: a global send rate plus a per-chat rate."""
+
+    # Idle per-chat buckets are dropped beyond this many
+    MAX_CHAT_BUCKETS = 10_000
+
+    def __init__(self, global_rate: float, per_chat_rate: float):
+        self.per_chat_rate = per_chat_rate
+        self.global_bucket = TokenBucket(global_rate)
+        self.chats: dict = {}
+
+    def chat(self, chat_id: str) -> TokenBucket:
+        bucket = self.chats.get(chat_id)
+        if bucket is None:
+            if len(self.chats) >= self.MAX_CHAT_BUCKETS:
+                self.chats = {k: b for k, b in self.chats.items() if not b.idle()}
+            bucket = self.chats[chat_id] = TokenBucket(self.per_chat_rate)
+        return bucket
+
+    async def acquire(self, chat_id: str):
+        # Per-chat first, so a throttled chat never sits on a global token
+        await self.chat(chat_id).acquire()
+        await self.global_bucket.acquire()
+
+
+def backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff, capped at 30s."""
+    return random.uniform(0, min(2**attempt, 30))  # nosec B311 - jitter, not crypto
+
+
+def _cut_point(line: str, limit: int) -> int:
+    """
+    Where to hard-split an overlong line: after the last whitespace within
+    `limit` that is outside an HTML tag or entity, else after the last
+    character outside one, so parse_mode=HTML never sees a broken tag.
+    """
+    closing, safe, space = None, 0, 0
+    for i, char in enumerate(line[:limit]):
+        if closing is None and char in "<&":
+            closing = ">" if char == "<" else ";"
+            continue
+        if char == closing:
+            closing = None
+        if closing is None:
+            safe = i + 1
+            if char.isspace():
+                space = i + 1
+    return space or safe or limit
+
+
+def split_message(text: str, limit: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """
+    Split at line boundaries into chunks of at most `limit` characters. A
+    single line longer than `limit` is cut at a safe point (see _cut_point).
+    """
+    chunks, current = [], ""
+    for line in text.splitlines(keepends=True):
+        while len(line) > limit:
+            if current:
+                chunks.append(current)
+                current = ""
+            cut = _cut_point(line, limit)
+            chunks.append(line[:cut])
+            line = line[cut:]
+        if len(current) + len(line) > limit:
+            chunks.append(current)
+            current = ""
+        current += line
+    if current:
+        chunks.append(current)
+    return chunks
+
 
 class NotificationService:
     TELEGRAM_API_URL = "https://api.telegram.org/bot"
+    RETRY_STATUSES = {500, 502, 503, 504}
+
+    # One pooled client and limiter per event loop (API/worker run one loop)
+    _client: Optional[httpx.AsyncClient] = None
+    _limiter: Optional[RateLimiter] = None
+    _loop: Optional[asyncio.AbstractEventLoop] = None
 
     @classmethod
-    async def send_telegram_message(cls, chat_id: str, message: str):
-        """Send a raw message to a specific chat."""
-        if not settings.TELEGRAM_BOT_TOKEN:
-            logger.warning("TELEGRAM_BOT_TOKEN not set. Skipping notification.")
-            return
+    def _state(cls) -> tuple[httpx.AsyncClient, RateLimiter]:
+        loop = asyncio.get_running_loop()
+        if cls._client is None or cls._loop is not loop:
+            cls._client = httpx.AsyncClient(
+                timeout=settings.TELEGRAM_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=settings.TELEGRAM_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.TELEGRAM_MAX_CONNECTIONS,
+                ),
+            )
+            cls._limiter = RateLimiter(
+                settings.TELEGRAM_GLOBAL_RATE, settings.TELEGRAM_PER_CHAT_RATE
+            )
+            cls._loop = loop
+        return cls._client, cls._limiter
+
+    @classmethod
+    async def aclose(cls):
+        if cls._client is not None:
+            await cls._client.aclose()
+        cls._client = cls._limiter = cls._loop = None
 
+    @classmethod
+    async def _send_chunk(cls, chat_id: str, text: str) -> bool:
+        client, limiter = cls._state()
         url = f"{cls.TELEGRAM_API_URL}{settings.TELEGRAM_BOT_TOKEN}/sendMessage"
         payload = {
             "chat_id": chat_id,
-            "text": message,
+            "text": text,
             "parse_mode": "HTML",
             "disable_web_page_preview": True,
         }
 
-        async with httpx.AsyncClient() as client:
+        for attempt in range(settings.TELEGRAM_MAX_RETRIES + 1):
+            await limiter.acquire(chat_id)
+            started = time.perf_counter()
             try:
-                response = await client.post(url, json=payload, timeout=10.0)
-                if response.status_code != 200:
-                    logger.error(f"Failed to send Telegram msg: {response.text}")
-            except Exception as e:
-                logger.error(f"Error sending Telegram msg: {e}")
+                response = await client.post(url, json=payload)
+            except httpx.TransportError as e:
+                TELEGRAM_SEND_ERRORS.labels(type(e).__name__).inc()
+                logger.warning(f"Error sending Telegram msg to {chat_id}: {e}")
+                await asyncio.sleep(backoff(attempt))
+                continue
+            finally:
+                TELEGRAM_SEND_SECONDS.observe(time.perf_counter() - started)
 
-    @classmethod
-    async def notify_new_events(cls, events: List[Event]):
-        """Send a summary of new events to admins."""
-        if not events:
-            return
+            if response.status_code == 200:
+                return True
+
+            TELEGRAM_SEND_ERRORS.labels(f"http_{response.status_code}").inc()
+            if response.status_code == 429:
+                try:
+                    retry_after = response.json()["parameters"]["retry_after"]
+                except (ValueError, KeyError, TypeError):
+                    retry_after = 1
+                logger.warning(f"Telegram 429 for {chat_id}, retry in {retry_after}s")
+                # May be the global flood limit: hold every chat, not just this one
+                limiter.chat(chat_id).pause(float(retry_after))
+                limiter.global_bucket.pause(float(retry_after))
+                continue
+            if response.status_code in cls.RETRY_STATUSES:
+                await asyncio.sleep(backoff(attempt))
+                continue
 
-        if not settings.TELEGRAM_ADMIN_IDS:
-            logger.warning("No TELEGRAM_ADMIN_IDS configured. Skipping notification.")
-            return
+            logger.error(f"Failed to send Telegram msg: {response.text}")
+            return False
 
-        # Prepare Message
-        # Telegram has a limit (4096 chars), so keep it brief or split.
-        # For now, we assume batch size isn't huge (50 items) but we should be careful.
+        logger.error(f"Giving up on Telegram msg to {chat_id} after retries")
+        return False
 
-        header = f"🚨 <b>{len(events)} New CTF Events Found!</b>\n\n"
-        body = ""
-        for event in events[:10]:  # Limit to top 10 to avoid spamming/limit issues
-            start = event.start_time.strftime("%Y-%m-%d")
-            body += f"🔹 <a href='{event.url}'>{event.title}</a> ({start})\n"
+    @classmethod
+    async def send_telegram_message(cls, chat_id: str, message: str) -> bool:
+        """Send a message to a chat, split into parts Telegram accepts, in order."""
+        if not settings.TELEGRAM_BOT_TOKEN:
+            logger.warning("TELEGRAM_BOT_TOKEN not set. Skipping notification.")
+            return False
 
-        if len(events) > 10:
-            body += f"\n<i>...and {len(events) - 10} more.</i>"
+        for chunk in split_message(message):
+            if not await cls._send_chunk(chat_id, chunk):
+                return False
+        return True
 
-        full_message = header + body
+    @staticmethod
+    def format_event(event: Event) -> str:
+        """One digest line; bounded in length so messages split between lines."""
+        title = event.title
+        if len(title) > MAX_TITLE_LENGTH:
+            title = title[: MAX_TITLE_LENGTH - 1] + "…"
+        title = html.escape(title)
+        start = event.start_time.strftime("%Y-%m-%d")
+        if not event.url or len(event.url) > MAX_URL_LENGTH:
+            return f"🔹 {title} ({start})\n"
+        url = html.escape(event.url, quote=True)
+        return f"🔹 <a href='{url}'>{title}</a> ({start})\n"
 
-        # Send to all admins
-        for admin_id in settings.TELEGRAM_ADMIN_IDS:
-            await cls.send_telegram_message(str(admin_id), full_message)
+    @classmethod
+    def digest_messages(cls, events: List[Event]) -> List[Tuple[str, List[Event]]]:
+        """
+        Pack a digest into messages of at most MAX_MESSAGE_LENGTH characters,
+        each paired with the events it lists, so delivery can be tracked per
+        message.
+        """
+        messages, listed = [], []
+        text = f"🚨 <b>{len(events)} New CTF Events Found!</b>\n\n"
+        for event in events:
+            line = cls.format_event(event)
+            if listed and len(text) + len(line) > MAX_MESSAGE_LENGTH:
+                messages.append((text, listed))
+                text, listed = "", []
+            text += line
+            listed.append(event)
+        if listed:
+            messages.append((text, listed))
+        return messages
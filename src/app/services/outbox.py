@@ -0,0 +1,208 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import List, Optional
+
+from sqlalchemy import case, func, literal_column, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.app.core.config import settings
+from src.app.db.models import Event, NotificationOutbox
+from src.app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Fixed ARQ job id: while a drain is queued or running, extra triggers are dropped
+DELIVER_JOB = "deliver_notifications"
+# Rows per INSERT (3 bind params each)
+ENQUEUE_CHUNK_SIZE = 5000
+
+
+class OutboxService:
+    @classmethod
+    async def recipients(
+        cls, session: AsyncSession, events: List[Event]
+    ) -> list[tuple[str, int]]:
+        """
+        (chat_id, event_id) pairs to alert for freshly inserted events: admins
+        get every event, subscribers the events their rules match.
+        """
+        from src.app.services.subscriptions import SubscriptionService
+
+        admins = [str(chat_id) for chat_id in settings.TELEGRAM_ADMIN_IDS]
+        deliveries = {(chat_id, event.id) for event in events for chat_id in admins}
+        matcher = await SubscriptionService.matcher(session)
+        deliveries.update(matcher.match(events))
+        return sorted(deliveries)
+
+    @classmethod
+    async def enqueue(cls, session: AsyncSession, events: List[Event]) -> int:
+        """
+        Queue alerts for `events` in the caller's transaction, so they commit
+        (or roll back) together with the upsert that created the events.
+        """
+        rows = [
+            {"chat_id": chat_id, "event_id": event_id}
+            for chat_id, event_id in await cls.recipients(session, events)
+        ]
+        for i in range(0, len(rows), ENQUEUE_CHUNK_SIZE):
+            stmt = insert(NotificationOutbox).values(rows[i : i + ENQUEUE_CHUNK_SIZE])
+            await session.execute(
+                stmt.on_conflict_do_nothing(constraint="uq_outbox_chat_event")
+            )
+        return len(rows)
+
+    @classmethod
+    async def schedule_delivery(cls, redis):
+        """Ask the worker to drain the outbox soon (no-op outside ARQ)."""
+        if redis is None or not hasattr(redis, "enqueue_job"):
+            return
+        await redis.enqueue_job(DELIVER_JOB, _job_id=DELIVER_JOB)
+
+    @classmethod
+    async def claim(cls, session: AsyncSession, limit: int) -> list:
+        """
+        Lease up to `limit` due rows: pushing available_at past the lease hides
+        them from other drains, and brings them back if this one dies mid-send.
+        """
+        due = (
+            select(NotificationOutbox.id)
+            .where(
+                NotificationOutbox.status == "pending",
+                NotificationOutbox.available_at <= func.now(),
+            )
+            .order_by(NotificationOutbox.available_at, NotificationOutbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id.in_(due.scalar_subquery()))
+            .values(
+                attempts=NotificationOutbox.attempts + 1,
+                available_at=func.now()
+                + settings.OUTBOX_LEASE_SECONDS * literal_column("interval '1 second'"),
+            )
+            .returning(
+                NotificationOutbox.id,
+                NotificationOutbox.chat_id,
+                NotificationOutbox.event_id,
+            )
+        )
+        result = await session.execute(stmt)
+        rows = result.all()
+        await session.commit()
+        return rows
+
+    @classmethod
+    async def mark_sent(cls, session: AsyncSession, ids: list):
+        # status guard: a row is only ever marked delivered once
+        await session.execute(
+            update(NotificationOutbox)
+            .where(
+                NotificationOutbox.id.in_(ids), NotificationOutbox.status == "pending"
+            )
+            .values(status="sent", sent_at=func.now(), last_error=None)
+        )
+
+    @classmethod
+    async def mark_failed(cls, session: AsyncSession, ids: list, error: str):
+        """Back off exponentially; give up after OUTBOX_MAX_ATTEMPTS."""
+        delay = func.least(
+            settings.OUTBOX_RETRY_BASE * func.power(2, NotificationOutbox.attempts - 1),
+            settings.OUTBOX_RETRY_MAX,
+        )
+        await session.execute(
+            update(NotificationOutbox)
+            .where(
+                NotificationOutbox.id.in_(ids), NotificationOutbox.status == "pending"
+            )
+            .values(
+                status=case(
+                    (
+                        NotificationOutbox.attempts >= settings.OUTBOX_MAX_ATTEMPTS,
+                        "failed",
+                    ),
+                    else_="pending",
+                ),
+                available_at=func.now() + delay * literal_column("interval '1 second'"),
+                last_error=error[:500],
+            )
+        )
+
+    @classmethod
+    async def drain(cls) -> dict:
+        """
+        Deliver due alerts in batches: one digest per chat per batch, sent
+        concurrently through NotificationService's rate limiter. A digest too
+        long for one message is settled message by message, so a failure only
+        retries the rows that were not delivered yet.
+        """
+        from src.app.services.notifications import NotificationService
+
+        stats = {"batches": 0, "sent": 0, "failed": 0}
+        if not settings.TELEGRAM_BOT_TOKEN:
+            logger.warning("TELEGRAM_BOT_TOKEN not set. Outbox left queued.")
+            return stats
+
+        async with AsyncSessionLocal() as session:
+            for _ in range(settings.OUTBOX_MAX_BATCHES):
+                claimed = await cls.claim(session, settings.OUTBOX_BATCH_SIZE)
+                if not claimed:
+                    break
+                stats["batches"] += 1
+
+                event_ids = {row.event_id for row in claimed}
+                result = await session.scalars(
+                    select(Event).where(Event.id.in_(event_ids))
+                )
+                events = {event.id: event for event in result.all()}
+
+                by_chat = defaultdict(list)
+                for row in claimed:
+                    by_chat[row.chat_id].append(row)
+
+                async def deliver(
+                    chat_id: str, rows: list
+                ) -> tuple[list, Optional[str]]:
+                    """
+                    Send the chat's digest one message at a time; returns the
+                    ids of rows delivered so far and the error that stopped it.
+                    """
+                    row_ids = {r.event_id: r.id for r in rows}
+                    # Events deleted since queueing leave nothing to send
+                    done = [r.id for r in rows if r.event_id not in events]
+                    digest = [events[e] for e in row_ids if e in events]
+                    digest.sort(key=lambda e: e.start_time)
+                    for text, listed in NotificationService.digest_messages(digest):
+                        try:
+                            ok = await NotificationService.send_telegram_message(
+                                chat_id, text
+                            )
+                        except Exception as e:
+                            return done, repr(e)
+                        if not ok:
+                            return done, "send failed"
+                        # Rows of delivered messages are settled, never resent
+                        done.extend(row_ids[event.id] for event in listed)
+                    return done, None
+
+                chats = list(by_chat.items())
+                outcomes = await asyncio.gather(
+                    *(deliver(chat_id, rows) for chat_id, rows in chats)
+                )
+
+                for (chat_id, rows), (done, error) in zip(chats, outcomes):
+                    if done:
+                        await cls.mark_sent(session, done)
+                        stats["sent"] += len(done)
+                    if error is not None:
+                        delivered = set(done)
+                        ids = [r.id for r in rows if r.id not in delivered]
+                        await cls.mark_failed(session, ids, error)
+                        stats["failed"] += len(ids)
+                await session.commit()
+
+        logger.info(f"Outbox drained: {stats}")
+        return stats
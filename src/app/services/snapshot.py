@@ -0,0 +1,196 @@
+import asyncio
+import bisect
+import logging
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import func
+from sqlalchemy.future import select
+
+from src.app.core.config import settings
+from src.app.core.redis import get_redis
+from src.app.db.models import Event
+from src.app.db.session import AsyncSessionLocal
+from src.app.services.cache import CHANGES_CHANNEL, get_data_version
+from src.app.services.event_filters import EventFilters
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _micros(dt: datetime) -> int:
+    """Exact int64 epoch microseconds (naive datetimes are taken as UTC)."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - EPOCH) // timedelta(microseconds=1)
+
+
+def _encode(values: Iterable[Optional[str]]) -> tuple[dict, array]:
+    """Dictionary-encode a low-cardinality column: ({value: code}, codes)."""
+    vocab: dict = {}
+    codes = array("H", (vocab.setdefault(v, len(vocab)) for v in values))
+    return vocab, codes
+
+
+class EventSnapshot:
+    """
+    Immutable columnar copy of upcoming events, in (start_time, id) order.
+    Start times and ids are int64 arrays, type/format small dictionary codes and
+    tags one bitmask per event; rows holds the EventSummary dicts to return.
+    """
+
+    def __init__(self, rows: list[dict], version: Optional[int] = None):
+        self.rows = rows
+        self.version = version
+        self.ids = array("q", (r["id"] for r in rows))
+        self.starts = array("q", (_micros(r["start_time"]) for r in rows))
+        self.weights = array("d", (r["weight"] or 0.0 for r in rows))
+        self.types, self.type_codes = _encode(r["type"] for r in rows)
+        self.formats, self.format_codes = _encode(r["format"] for r in rows)
+
+        self.tag_bits: dict = {}
+        self.tag_masks = []
+        for r in rows:
+            mask = 0
+            for tag in r["tags"] or ():
+                mask |= 1 << self.tag_bits.setdefault(tag, len(self.tag_bits))
+            self.tag_masks.append(mask)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def query(
+        self,
+        filters: EventFilters,
+        limit: int,
+        after: Optional[tuple[datetime, int]] = None,
+        now: Optional[datetime] = None,
+    ) -> list[dict]:
+        """
+        Up to `limit` rows starting after `now` (and after the keyset cursor),
+        matching the filters; same rows and order as the SQL listing.
+        """
+        n = len(self.rows)
+        lo = bisect.bisect_right(
+            self.starts, _micros(now or datetime.now(timezone.utc))
+        )
+        if after is not None:
+            after_start, after_id = _micros(after[0]), after[1]
+            i = bisect.bisect_left(self.starts, after_start, lo)
+            while i < n and self.starts[i] == after_start and self.ids[i] <= after_id:
+                i += 1
+            lo = max(lo, i)
+
+        checks = []
+        if filters.type:
+            code = self.types.get(filters.type)
+            if code is None:
+                return []
+            checks.append(lambda i, codes=self.type_codes: codes[i] == code)
+        if filters.format:
+            fcode = self.formats.get(filters.format)
+            if fcode is None:
+                return []
+            checks.append(lambda i, codes=self.format_codes: codes[i] == fcode)
+        if filters.tags:
+            bits = [self.tag_bits.get(t) for t in filters.tags]
+            if filters.match_all and None in bits:
+                return []
+            want = sum(1 << b for b in bits if b is not None)
+            if not want:
+                return []
+            masks = self.tag_masks
+            if filters.match_all:
+                checks.append(lambda i: masks[i] & want == want)
+            else:
+                checks.append(lambda i: masks[i] & want)
+        if filters.min_weight is not None:
+            min_weight = filters.min_weight
+            checks.append(lambda i, weights=self.weights: weights[i] >= min_weight)
+
+        out = []
+        for i in range(lo, n):
+            if all(check(i) for check in checks):
+                out.append(self.rows[i])
+                if len(out) >= limit:
+                    break
+        return out
+
+
+async def load_snapshot() -> EventSnapshot:
+    from src.app.api.endpoints.events import SUMMARY_COLUMNS
+
+    # Version first: a bump racing the load just triggers another reload
+    try:
+        version = await get_data_version()
+    except Exception:
+        version = None
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(*SUMMARY_COLUMNS)
+            .where(Event.start_time > func.now())
+            .order_by(Event.start_time.asc(), Event.id.asc())
+        )
+        rows = [dict(row) for row in result.mappings()]
+    return EventSnapshot(rows, version)
+
+
+class SnapshotManager:
+    """
+    Holds the current EventSnapshot for this process and swaps in a fresh one
+    whenever ingestion publishes on CHANGES_CHANNEL. Readers grab `current`
+    once per request, so a reload never exposes a half-built snapshot.
+    """
+
+    def __init__(self):
+        self.current: Optional[EventSnapshot] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def reload(self):
+        snapshot = await load_snapshot()
+        self.current = snapshot
+        logger.info(
+            f"Loaded events snapshot: {len(snapshot)} upcoming, version {snapshot.version}"
+        )
+
+    async def run(self):
+        while True:
+            pubsub = get_redis().pubsub()
+            try:
+                await pubsub.subscribe(CHANGES_CHANNEL)
+                # Catch up on anything published while we were not subscribed
+                await self.reload()
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    current = self.current
+                    # Bursts of bumps collapse into the first reload that sees them
+                    if current and current.version is not None:
+                        if int(message["data"]) <= current.version:
+                            continue
+                    await self.reload()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Events snapshot listener failed, retrying: {e}")
+                await asyncio.sleep(settings.EVENTS_SNAPSHOT_RETRY)
+            finally:
+                await pubsub.aclose()
+
+    def start(self):
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self.current = None
+
+
+snapshots = SnapshotManager()
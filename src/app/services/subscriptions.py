@@ -0,0 +1,160 @@
+import logging
+import math
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.app.core.redis import get_redis
+from src.app.db.models import Event, Subscription
+from src.app.services.event_filters import normalize_tags
+
+logger = logging.getLogger(__name__)
+
+# Bumped on every subscription change; cached matchers key off it
+SUBSCRIPTIONS_VERSION_KEY = "subscriptions:version"
+
+
+class Rule(NamedTuple):
+    chat_id: str
+    tags: frozenset
+    type: Optional[str]
+    format: Optional[str]
+    min_weight: Optional[float]
+
+    def accepts(self, event: Event) -> bool:
+        if self.type and event.type != self.type:
+            return False
+        if self.format and event.format != self.format:
+            return False
+        if self.min_weight is not None and (event.weight or 0.0) < self.min_weight:
+            return False
+        return not self.tags or not self.tags.isdisjoint(event.tags or ())
+
+
+def _threshold(rule: Rule) -> float:
+    return -math.inf if rule.min_weight is None else rule.min_weight
+
+
+class SubscriptionMatcher:
+    """
+    Inverted index over subscription rules. Rules with tags are filed under
+    each tag. The rest are bucketed by their exact (type, format), either of
+    which may be a wildcard, and each bucket is sorted by min_weight so an
+    event's weight bisects off the rules it meets. An event only visits the
+    rules sharing one of its tags plus the tagless rules it fully matches, so
+    matching a batch costs about the number of matches rather than events x
+    rules.
+    """
+
+    def __init__(self, rules: Iterable[Rule]):
+        self.by_tag = defaultdict(list)
+        self.by_attrs = {}
+        self.size = 0
+        buckets = defaultdict(list)
+        for rule in rules:
+            self.size += 1
+            if rule.tags:
+                for tag in rule.tags:
+                    self.by_tag[tag].append(rule)
+            else:
+                buckets[(rule.type or None, rule.format or None)].append(rule)
+        for key, bucket in buckets.items():
+            bucket.sort(key=_threshold)
+            self.by_attrs[key] = ([_threshold(rule) for rule in bucket], bucket)
+
+    def candidates(self, event: Event) -> set:
+        found = set()
+        weight = event.weight or 0.0
+        type, format = event.type or None, event.format or None
+        for key in {(type, format), (type, None), (None, format), (None, None)}:
+            if key in self.by_attrs:
+                thresholds, bucket = self.by_attrs[key]
+                found.update(bucket[: bisect_right(thresholds, weight)])
+        for tag in event.tags or ():
+            found.update(self.by_tag.get(tag, ()))
+        return found
+
+    def match(self, events: Iterable[Event]) -> list[tuple[str, int]]:
+        """Distinct (chat_id, event_id) deliveries for `events`."""
+        deliveries = set()
+        for event in events:
+            for rule in self.candidates(event):
+                if rule.accepts(event):
+                    deliveries.add((rule.chat_id, event.id))
+        return sorted(deliveries)
+
+
+_cached: Optional[tuple[int, SubscriptionMatcher]] = None
+
+
+class SubscriptionService:
+    @classmethod
+    async def matcher(cls, session: AsyncSession) -> SubscriptionMatcher:
+        """Matcher over active subscriptions, rebuilt only after a change."""
+        global _cached
+        try:
+            version = int(await get_redis().get(SUBSCRIPTIONS_VERSION_KEY) or 0)
+        except Exception as e:
+            logger.error(f"Subscription version unavailable, reloading rules: {e}")
+            version = None
+        if version is not None and _cached is not None and _cached[0] == version:
+            return _cached[1]
+
+        result = await session.execute(
+            select(
+                Subscription.chat_id,
+                Subscription.tags,
+                Subscription.type,
+                Subscription.format,
+                Subscription.min_weight,
+            ).where(Subscription.active.is_(True))
+        )
+        matcher = SubscriptionMatcher(
+            Rule(chat_id, frozenset(tags or ()), type, format, min_weight)
+            for chat_id, tags, type, format, min_weight in result.all()
+        )
+        if version is not None:
+            _cached = (version, matcher)
+        logger.info(f"Loaded {matcher.size} subscription rules (version {version})")
+        return matcher
+
+    @classmethod
+    async def subscribe(
+        cls,
+        session: AsyncSession,
+        chat_id: str,
+        tags: Optional[List[str]] = None,
+        type: Optional[str] = None,
+        format: Optional[str] = None,
+        min_weight: Optional[float] = None,
+    ) -> Subscription:
+        subscription = Subscription(
+            chat_id=str(chat_id),
+            tags=normalize_tags(tags),
+            type=type,
+            format=format,
+            min_weight=min_weight,
+        )
+        session.add(subscription)
+        await session.commit()
+        await cls.changed()
+        return subscription
+
+    @classmethod
+    async def unsubscribe(cls, session: AsyncSession, subscription_id: int) -> bool:
+        result = await session.execute(
+            update(Subscription)
+            .where(Subscription.id == subscription_id, Subscription.active.is_(True))
+            .values(active=False)
+        )
+        await session.commit()
+        await cls.changed()
+        return result.rowcount > 0
+
+    @classmethod
+    async def changed(cls):
+        """Invalidate cached matchers (call after commit)."""
+        await get_redis().incr(SUBSCRIPTIONS_VERSION_KEY)
@@ -0,0 +1,207 @@
+import asyncio
+import hashlib
+import logging
+import random
+import time
+from typing import Optional
+
+import httpx
+
+from src.app.core.config import settings
+from src.app.core.metrics import (
+    SCRAPER_FETCH_BYTES,
+    SCRAPER_FETCH_RESPONSES,
+    SCRAPER_FETCH_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "CTFTracker/1.0 (Student Project; Contact: admin@example.com)"
+
+
+class HttpFetcher:
+    """
+    Shared HTTP layer for all scrapers.
+    One instance lives for the whole ARQ worker so connections (and TLS
+    sessions) are kept alive and reused between jobs.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    # Conditional GET validators + body digest, one Redis hash per source
+    VALIDATOR_KEY_PREFIX = "scraper:validators:"
+    VALIDATOR_TTL_SECONDS = 7 * 24 * 3600
+
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        redis=None,
+        max_retries: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        backoff_max: Optional[float] = None,
+    ):
+        self.client = client or self._build_client()
+        # Optional redis.asyncio client (ARQ's ctx["redis"]); enables get_if_changed
+        self.redis = redis
+        self.max_retries = (
+            settings.SCRAPER_MAX_RETRIES if max_retries is None else max_retries
+        )
+        self.backoff_base = (
+            settings.SCRAPER_BACKOFF_BASE if backoff_base is None else backoff_base
+        )
+        self.backoff_max = (
+            settings.SCRAPER_BACKOFF_MAX if backoff_max is None else backoff_max
+        )
+
+    @staticmethod
+    def _build_client() -> httpx.AsyncClient:
+        http2 = settings.SCRAPER_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("SCRAPER_HTTP2 set but 'h2' is missing, using HTTP/1.1")
+                http2 = False
+
+        return httpx.AsyncClient(
+            http2=http2,
+            timeout=httpx.Timeout(
+                settings.SCRAPER_TIMEOUT, connect=settings.SCRAPER_CONNECT_TIMEOUT
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.SCRAPER_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.SCRAPER_MAX_KEEPALIVE,
+            ),
+            headers={"User-Agent": USER_AGENT},
+            follow_redirects=True,
+        )
+
+    def backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to wait before retry `attempt` (full jitter, honours Retry-After)."""
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        ceiling = min(self.backoff_max, self.backoff_base * 2**attempt)
+        return random.uniform(0, ceiling)  # nosec B311 - jitter, not crypto
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        source: str = "other",
+    ) -> httpx.Response:
+        """GET with retries on transport errors, 429 and 5xx. Raises on final failure."""
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                response = await self.client.get(url, params=params, headers=headers)
+            except httpx.TransportError as e:
+                SCRAPER_FETCH_SECONDS.labels(source).observe(
+                    time.perf_counter() - started
+                )
+                SCRAPER_FETCH_RESPONSES.labels(source, "error").inc()
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.backoff(attempt)
+                logger.warning(f"Fetch {url} failed ({e!r}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            SCRAPER_FETCH_SECONDS.labels(source).observe(time.perf_counter() - started)
+            SCRAPER_FETCH_RESPONSES.labels(source, response.status_code).inc()
+            SCRAPER_FETCH_BYTES.labels(source).inc(len(response.content))
+
+            if response.status_code in self.RETRY_STATUSES and (
+                attempt < self.max_retries
+            ):
+                delay = self.backoff(attempt, response.headers.get("Retry-After"))
+                logger.warning(
+                    f"Fetch {url} returned {response.status_code}, retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            if response.status_code != 304:
+                response.raise_for_status()
+            return response
+
+    @classmethod
+    def _validator_key(cls, cache_key: str) -> str:
+        return cls.VALIDATOR_KEY_PREFIX + hashlib.sha256(cache_key.encode()).hexdigest()
+
+    async def get_if_changed(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        cache_key: Optional[str] = None,
+        source: str = "other",
+    ) -> Optional[httpx.Response]:
+        """
+        Conditional GET. Returns None when the source is unchanged (304 or a
+        body identical to the last processed one), otherwise the response.
+        Call `remember` once the response has been fully processed.
+        """
+        if self.redis is None:
+            return await self.get(url, params=params, headers=headers, source=source)
+
+        key = self._validator_key(cache_key or url)
+        cached = {
+            _as_str(k): _as_str(v) for k, v in (await self.redis.hgetall(key)).items()
+        }
+
+        headers = dict(headers or {})
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        response = await self.get(url, params=params, headers=headers, source=source)
+        if response.status_code == 304:
+            logger.info(f"{url} not modified (304), skipping")
+            return None
+
+        if cached.get("digest") == _digest(response.content):
+            logger.info(f"{url} body unchanged, skipping")
+            # Refresh validators so the next poll can get a cheap 304
+            await self._store_validators(key, response)
+            return None
+
+        return response
+
+    async def remember(
+        self, url: str, response: httpx.Response, cache_key: Optional[str] = None
+    ):
+        """Persist validators/digest for a response whose pipeline succeeded."""
+        if self.redis is None:
+            return
+        await self._store_validators(self._validator_key(cache_key or url), response)
+
+    async def _store_validators(self, key: str, response: httpx.Response):
+        mapping = {"digest": _digest(response.content)}
+        if response.headers.get("ETag"):
+            mapping["etag"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            mapping["last_modified"] = response.headers["Last-Modified"]
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, self.VALIDATOR_TTL_SECONDS)
+            await pipe.execute()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+def _digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def _as_str(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
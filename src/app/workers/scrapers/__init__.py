@@ -1,8 +1,134 @@
-# Base class for scrapers will go here using polite scraping logic
+import functools
+import hashlib
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Iterator, Optional, Sequence
+
+import httpx
+from redis.exceptions import LockError
+
+from src.app.core.config import settings
+from src.app.core.redis import get_redis
+from src.app.workers.http import HttpFetcher
+
+logger = logging.getLogger(__name__)
+
+# Held for the whole run of a source's ingest job, whichever worker runs it
+LOCK_KEY = "scraper:lock:{source}"
+
+
+def exclusive(source: str):
+    """
+    Run the decorated ARQ job at most once at a time per source across all
+    workers: a run that finds the lock taken is skipped, not queued, so slow
+    runs never stack up behind each other.
+    """
+
+    def decorator(job):
+        @functools.wraps(job)
+        async def wrapper(ctx, *args, **kwargs):
+            lock = get_redis().lock(
+                LOCK_KEY.format(source=source), timeout=settings.SCRAPER_LOCK_TIMEOUT
+            )
+            if not await lock.acquire(blocking=False):
+                logger.warning(f"{source} ingest already running, skipping")
+                return {"skipped": "locked"}
+            try:
+                return await job(ctx, *args, **kwargs)
+            finally:
+                try:
+                    await lock.release()
+                except LockError:
+                    # Expired mid-run (and maybe taken over): nothing to release
+                    logger.warning(f"{source} ingest lock expired before release")
+
+        return wrapper
+
+    return decorator
+
+
+def chunked(items: Sequence, size: int) -> Iterator[Sequence]:
+    """Yield successive slices of `items` with at most `size` elements."""
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def fingerprint(row: dict) -> str:
+    """Stable digest of a normalized event row, used to skip no-op updates."""
+    payload = {k: v for k, v in row.items() if k != "fingerprint"}
+    canonical = json.dumps(payload, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
 class BaseScraper:
-    def __init__(self):
-        pass
+    # Short name used in Redis keys and job stats
+    SOURCE = "base"
+    # Rows per INSERT statement (asyncpg caps a statement at 32767 bind params)
+    UPSERT_CHUNK_SIZE = 500
+    # Redis key holding how far ahead this source has been synced (unix seconds)
+    HIGH_WATER_KEY = "scraper:high_water:{source}"
+
+    def __init__(self, fetcher: Optional[HttpFetcher] = None):
+        # Shared worker-wide fetcher (see tasks.startup); None means one-off use
+        self.fetcher = fetcher
+        # Changed responses waiting for `remember` once their pipeline succeeds
+        self._unprocessed = {}
+
+    async def fetch(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        conditional: bool = False,
+        cache_key: Optional[str] = None,
+    ) -> Optional[httpx.Response]:
+        """
+        GET `url` through the pooled, retrying fetch layer.
+        With `conditional=True` returns None when the source is unchanged.
+        """
+        if self.fetcher is None:
+            async with HttpFetcher() as fetcher:
+                return await fetcher.get(
+                    url, params=params, headers=headers, source=self.SOURCE
+                )
+
+        if not conditional:
+            return await self.fetcher.get(
+                url, params=params, headers=headers, source=self.SOURCE
+            )
+
+        response = await self.fetcher.get_if_changed(
+            url, params=params, headers=headers, cache_key=cache_key, source=self.SOURCE
+        )
+        if response is not None:
+            self._unprocessed[cache_key or url] = (url, response)
+        return response
+
+    async def remember(self, url: str, cache_key: Optional[str] = None):
+        """Mark a conditional fetch as processed so unchanged polls skip it."""
+        pending = self._unprocessed.pop(cache_key or url, None)
+        if pending is not None and self.fetcher is not None:
+            await self.fetcher.remember(*pending, cache_key=cache_key)
+
+    def forget(self, url: str, cache_key: Optional[str] = None):
+        """Drop a conditional fetch that must not be marked as processed."""
+        self._unprocessed.pop(cache_key or url, None)
+
+    async def remember_all(self):
+        """`remember` every conditional fetch still pending."""
+        for key, (url, _) in list(self._unprocessed.items()):
+            await self.remember(url, cache_key=key)
+
+    async def load_high_water(self, redis) -> Optional[datetime]:
+        if redis is None:
+            return None
+        value = await redis.get(self.HIGH_WATER_KEY.format(source=self.SOURCE))
+        if value is None:
+            return None
+        return datetime.fromtimestamp(int(value), tz=timezone.utc)
 
-    async def fetch(self, url: str):
-        # Implement httpx with rate limiting here
-        pass
+    async def save_high_water(self, redis, value: datetime):
+        if redis is not None:
+            key = self.HIGH_WATER_KEY.format(source=self.SOURCE)
+            await redis.set(key, int(value.timestamp()))
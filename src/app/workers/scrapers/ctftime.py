@@ -1,9 +1,13 @@
-from datetime import datetime
-import httpx
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.future import select
+from src.app.core.config import settings
 from src.app.db.session import AsyncSessionLocal
 from src.app.db.models import Event
-from src.app.workers.scrapers import BaseScraper
+from src.app.services.event_filters import normalize_tags
+from src.app.workers.scrapers import BaseScraper, chunked, exclusive, fingerprint
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,105 +16,254 @@ logger = logging.getLogger(__name__)
 class CTFTimeScraper(BaseScraper):
     BASE_URL = "https://ctftime.org/api/v1/events/"
 
-    async def fetch_events(self, limit: int = 100):
-        """Fetch upcoming events from CTFtime API."""
-        params = {
-            "limit": limit,
-            "start": int(datetime.now().timestamp()),
-            "finish": int(datetime.now().timestamp()) + 31536000,  # +1 Year
-        }
-        headers = {
-            "User-Agent": "CTFTracker/1.0 (Student Project; Contact: admin@example.com)"
-        }
+    SOURCE = "ctftime"
+    # Slices are aligned to a fixed grid so their cache keys stay stable between runs
+    SLICE_EPOCH = datetime(2000, 1, 1, tzinfo=timezone.utc)
+    # CTFtime filters on both start and finish, so each request reaches past its
+    # slice to catch events that straddle the boundary (duplicates are merged)
+    SLICE_OVERLAP = timedelta(days=14)
 
+    @classmethod
+    def slices(cls, start: datetime, finish: datetime) -> list:
+        """Split [start, finish) into grid-aligned (start, finish) slices."""
+        size = timedelta(days=settings.CTFTIME_SLICE_DAYS)
+        cursor = cls.SLICE_EPOCH + ((start - cls.SLICE_EPOCH) // size) * size
+        slices = []
+        while cursor < finish:
+            slices.append((cursor, cursor + size))
+            cursor += size
+        return slices
+
+    async def fetch_page(self, start: int, finish: int, limit: int, first: bool):
+        """One API call. Only a slice's first page is fetched conditionally."""
+        params = {"limit": limit, "start": start, "finish": finish}
         logger.info(f"Fetching events from {self.BASE_URL} with params {params}")
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(self.BASE_URL, params=params, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            logger.info(f"Fetched {len(data)} events from API.")
-            return data
-
-    async def normalize_and_save(self, events_data: list):
-        """Normalize CTF/Conf data and upsert into DB. Returns new (created) events."""
-        count = 0
-        new_events = []
+        response = await self.fetch(
+            self.BASE_URL,
+            params=params,
+            conditional=first,
+            cache_key=f"{self.BASE_URL}?start={start}&finish={finish}&limit={limit}",
+        )
+        return response.json() if response is not None else None
+
+    async def fetch_slice(self, start: datetime, finish: datetime, limit: int):
+        """
+        Page through one slice by advancing `start` to the latest event seen.
+        Returns None if the slice is unchanged since it was last processed.
+        """
+        start_ts = int(start.timestamp())
+        finish_ts = int((finish + self.SLICE_OVERLAP).timestamp())
+        first_key = f"{self.BASE_URL}?start={start_ts}&finish={finish_ts}&limit={limit}"
+
+        events = {}
+        cursor = start_ts
+        while True:
+            page = await self.fetch_page(
+                cursor, finish_ts, limit, first=cursor == start_ts
+            )
+            if page is None:
+                return None
+
+            before = len(events)
+            events.update((item["id"], item) for item in page)
+            if len(page) < limit or len(events) == before:
+                break
+
+            cursor = max(_timestamp(item["start"]) for item in page)
+
+        if cursor != start_ts:
+            # Multi-page slice: an unchanged first page says nothing about the rest
+            self.forget(self.BASE_URL, cache_key=first_key)
+        return list(events.values())
+
+    async def fetch_window(
+        self,
+        start: datetime,
+        finish: datetime,
+        limit: int = 100,
+        concurrency: Optional[int] = None,
+    ) -> tuple[list, int]:
+        """
+        Fetch every event in [start, finish) slice by slice with bounded
+        concurrency. Returns (events, number of unchanged slices).
+        """
+        return await self.fetch_slices(self.slices(start, finish), limit, concurrency)
+
+    async def fetch_slices(
+        self, slices: list, limit: int = 100, concurrency: Optional[int] = None
+    ) -> tuple[list, int]:
+        semaphore = asyncio.Semaphore(concurrency or settings.CTFTIME_SYNC_CONCURRENCY)
+
+        async def _bounded(window):
+            async with semaphore:
+                return await self.fetch_slice(*window, limit)
+
+        pages = await asyncio.gather(*(_bounded(w) for w in slices))
+
+        events = {}
+        for page in pages:
+            events.update((item["id"], item) for item in page or [])
+        unchanged = sum(1 for page in pages if page is None)
+        logger.info(
+            f"Fetched {len(events)} events from {len(slices)} slices ({unchanged} unchanged)."
+        )
+        return list(events.values()), unchanged
+
+    async def normalize_and_save(
+        self, events_data: list, stats: Optional[dict] = None, notify: bool = True
+    ):
+        """
+        Normalize CTF/Conf data and upsert into DB. Returns new (created) events.
+        Rows whose fingerprint is unchanged are not written at all; per-outcome
+        counts are added to `stats` when given. With `notify`, alerts for new
+        events are queued in the outbox within the same transaction.
+        """
+        from src.app.services.ai import AIService
+        from src.app.services.outbox import OutboxService
+
+        # Auto-Tagging (whole batch at once; model calls are cached and batched)
+        all_tags = await AIService.tag_batch(
+            (item["title"], item.get("description", "")) for item in events_data
+        )
+
+        # Deduplicate by source_id: ON CONFLICT cannot touch the same row twice
+        rows = {}
+        for item, tags in zip(events_data, all_tags):
+            source_id = f"ctftime_{item['id']}"
 
+            # Robust datetime parsing
+            try:
+                start = datetime.fromisoformat(item["start"].replace("Z", "+00:00"))
+                end = datetime.fromisoformat(item["finish"].replace("Z", "+00:00"))
+            except ValueError:
+                logger.error(
+                    f"Failed to parse dates for event {item.get('title')}: {item.get('start')}/{item.get('finish')}"
+                )
+                continue
+
+            # Update Meta
+            meta = item.copy()
+            meta["tags"] = tags
+
+            rows[source_id] = {
+                "source_id": source_id,
+                "title": item["title"],
+                "description": item.get("description", ""),
+                "url": item.get("url", "") or item.get("ctftime_url", ""),
+                "logo_url": item.get("logo", ""),
+                "type": "ctf",  # CTFtime mostly lists CTFs
+                "format": item.get("format", "Jeopardy"),
+                "start_time": start,
+                "end_time": end,
+                "weight": float(item.get("weight", 0)),
+                "tags": normalize_tags(tags),
+                "meta": meta,  # Store enriched payload
+            }
+            rows[source_id]["fingerprint"] = fingerprint(rows[source_id])
+
+        new_events = []
+        updated = unchanged = 0
         async with AsyncSessionLocal() as session:
-            for item in events_data:
-                source_id = f"ctftime_{item['id']}"
-
-                # Check for updates (idempotency)
-                query = select(Event).where(Event.source_id == source_id)
-                result = await session.execute(query)
-                existing_event = result.scalar_one_or_none()
-
-                # Robust datetime parsing
-                try:
-                    start = datetime.fromisoformat(item["start"].replace("Z", "+00:00"))
-                    end = datetime.fromisoformat(item["finish"].replace("Z", "+00:00"))
-                except ValueError:
-                    logger.error(
-                        f"Failed to parse dates for event {item.get('title')}: {item.get('start')}/{item.get('finish')}"
+            # At most two statements per chunk regardless of how many events we sync
+            for chunk in chunked(list(rows.values()), self.UPSERT_CHUNK_SIZE):
+                source_ids = [row["source_id"] for row in chunk]
+                result = await session.execute(
+                    select(Event.source_id, Event.fingerprint).where(
+                        Event.source_id.in_(source_ids)
                     )
-                    continue
+                )
+                existing = dict(result.all())
 
-                # Auto-Tagging
-                from src.app.services.ai import AIService
+                # No-op updates would still cost WAL traffic and index churn
+                changed = [
+                    row
+                    for row in chunk
+                    if existing.get(row["source_id"], "") != row["fingerprint"]
+                ]
+                unchanged += len(chunk) - len(changed)
+                if not changed:
+                    continue
 
-                tags = await AIService.generate_tags(
-                    item["title"], item.get("description", "")
+                stmt = insert(Event).values(changed)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[Event.source_id],
+                    set_={
+                        key: stmt.excluded[key]
+                        for key in changed[0]
+                        if key != "source_id"
+                    },
+                    # Guards against a concurrent sync writing the same payload
+                    where=Event.fingerprint.is_distinct_from(stmt.excluded.fingerprint),
+                ).returning(Event)
+                result = await session.scalars(
+                    stmt, execution_options={"populate_existing": True}
                 )
+                for event in result.all():
+                    if event.source_id in existing:
+                        updated += 1
+                    else:
+                        new_events.append(event)
 
-                # Update Meta
-                meta = item.copy()
-                meta["tags"] = tags
-
-                event_data = {
-                    "source_id": source_id,
-                    "title": item["title"],
-                    "description": item.get("description", ""),
-                    "url": item.get("url", "") or item.get("ctftime_url", ""),
-                    "logo_url": item.get("logo", ""),
-                    "type": "ctf",  # CTFtime mostly lists CTFs
-                    "format": item.get("format", "Jeopardy"),
-                    "start_time": start,
-                    "end_time": end,
-                    "weight": float(item.get("weight", 0)),
-                    "meta": meta,  # Store enriched payload
-                }
-
-                if existing_event:
-                    # Update fields
-                    for key, value in event_data.items():
-                        setattr(existing_event, key, value)
-                else:
-                    # Create new
-                    new_event = Event(**event_data)
-                    session.add(new_event)
-                    new_events.append(new_event)
-                count += 1
-
+            if notify and new_events:
+                await OutboxService.enqueue(session, new_events)
             await session.commit()
-            logger.info(f"Synced {count} events from CTFtime. New: {len(new_events)}")
+            logger.info(
+                f"Synced {len(rows)} events from CTFtime. New: {len(new_events)}, "
+                f"updated: {updated}, unchanged: {unchanged}"
+            )
+            if stats is not None:
+                stats["inserted"] = stats.get("inserted", 0) + len(new_events)
+                stats["updated"] = stats.get("updated", 0) + updated
+                stats["unchanged"] = stats.get("unchanged", 0) + unchanged
             return new_events
 
 
+def _timestamp(value: str) -> int:
+    return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp())
+
+
 # ARQ Job Function
+@exclusive("ctftime")
 async def ingest_ctftime_events(ctx, limit: int = 100):
-    from src.app.services.notifications import NotificationService
+    """
+    Incremental sync: always refresh the near-future window, and only extend
+    into the rest of the horizon beyond the stored high-water mark.
+    """
+    from src.app.services.cache import bump_data_version
+    from src.app.services.outbox import OutboxService
 
     logger.info("Starting CTFtime Ingest Job")
-    scraper = CTFTimeScraper()
+    scraper = CTFTimeScraper(fetcher=ctx.get("http"))
+    redis = ctx.get("redis")
     try:
-        data = await scraper.fetch_events(limit=limit)
-        new_events = await scraper.normalize_and_save(data)
+        now = datetime.now(timezone.utc)
+        near_end = now + timedelta(days=settings.CTFTIME_NEAR_WINDOW_DAYS)
+        horizon = now + timedelta(days=settings.CTFTIME_HORIZON_DAYS)
+
+        slices = scraper.slices(now, near_end)
+        high_water = await scraper.load_high_water(redis)
+        if high_water is None or high_water < horizon:
+            far = scraper.slices(max(near_end, high_water or near_end), horizon)
+            slices += [s for s in far if s not in slices]
+
+        data, unchanged = await scraper.fetch_slices(slices, limit=limit)
+        stats = {"fetched": len(data), "inserted": 0, "updated": 0, "unchanged": 0}
+        if unchanged == len(slices):
+            logger.info("CTFtime unchanged since last sync, skipped")
+            return stats
+
+        new_events = await scraper.normalize_and_save(data, stats=stats)
+        await scraper.remember_all()
+        await scraper.save_high_water(redis, horizon)
+        if stats["inserted"] or stats["updated"]:
+            await bump_data_version()
 
         if new_events:
-            logger.info(f"Sending notifications for {len(new_events)} new events.")
-            await NotificationService.notify_new_events(new_events)
+            # Alerts are already in the outbox; delivery runs as its own job
+            logger.info(f"Queued notifications for {len(new_events)} new events.")
+            await OutboxService.schedule_delivery(redis)
 
-        return f"Successfully ingested {len(data)} events ({len(new_events)} new)"
+        return stats
     except Exception as e:
         logger.error(f"Error during ingestion: {e}")
         raise e
@@ -1,122 +1,320 @@
-import httpx
+import asyncio
+import hashlib
 import logging
+import io
+import time
+from collections import defaultdict
+from typing import Iterable, Iterator, Union
 import defusedxml.ElementTree as ET
 from datetime import datetime, timezone
+from urllib.parse import urlsplit, urlunsplit
 
 # Actually, better to inherit BaseScraper and reuse a similar save logic or abstract it.
-from src.app.workers.scrapers import BaseScraper
+from src.app.core.config import settings
+from src.app.services.event_filters import normalize_tags
+from src.app.workers.scrapers import BaseScraper, chunked, exclusive
 from src.app.db.models import Event
 from src.app.db.session import AsyncSessionLocal
-from sqlalchemy.future import select
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
 
 logger = logging.getLogger(__name__)
 
 
 class RSSScraper(BaseScraper):
-    # Example Feeds (Security Conferences / News)
-    FEEDS = [
-        "https://www.usenix.org/rss.xml",  # USENIX Conferences
-        # Add more here
-    ]
+    SOURCE = "rss"
+    # Security Conferences / News feeds, configured via RSS_FEEDS
+    FEEDS = settings.RSS_FEEDS
+
+    # RSS 2.0 / RSS 1.0 use <item>, Atom uses <entry> (namespaces stripped)
+    ITEM_TAGS = {"item", "entry"}
 
     async def fetch_feed(self, url: str):
+        """Fetch raw feed bytes. Returns None if unchanged since the last ingest."""
         logger.info(f"Fetching RSS feed: {url}")
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            return response.text
+        response = await self.fetch(url, conditional=True)
+        # Bytes, so the parser honours the document's own encoding declaration
+        return response.content if response is not None else None
+
+    def iter_feed(self, xml_content: Union[str, bytes], source_label: str):
+        """
+        Incrementally parse an RSS 2.0 or Atom document, yielding normalized items.
+        Each item subtree is dropped once yielded, so memory stays flat.
+        """
+        if isinstance(xml_content, str):
+            xml_content = xml_content.encode("utf-8")
 
-    def parse_feed(self, xml_content: str, source_label: str):
-        events = []
+        parents = []
         try:
-            root = ET.fromstring(xml_content)
-            # Handle standard RSS 2.0
-            channel = root.find("channel")
-            if channel is None:
-                # Try Atom? For now assume RSS
-                return []
-
-            for item in channel.findall("item"):
-                title = (
-                    item.find("title").text
-                    if item.find("title") is not None
-                    else "No Title"
-                )
-                link = item.find("link").text if item.find("link") is not None else ""
-                desc = (
-                    item.find("description").text
-                    if item.find("description") is not None
-                    else ""
-                )
+            for event, elem in ET.iterparse(
+                io.BytesIO(xml_content), events=("start", "end")
+            ):
+                if event == "start":
+                    parents.append(elem)
+                    continue
 
-                # Basic normalization
-                events.append(
-                    {
-                        "id": link,  # Use link as unique ID
-                        "title": title,
-                        "url": link,
-                        "description": desc,
-                        "start": datetime.now(
-                            timezone.utc
-                        ).isoformat(),  # RSS items often lack future event dates, using now as placeholder for "News"
-                        "finish": datetime.now(timezone.utc).isoformat(),
-                        "source": source_label,
-                    }
-                )
+                parents.pop()
+                if _local_name(elem.tag) not in self.ITEM_TAGS:
+                    continue
+
+                yield self._normalize_item(elem, source_label)
+
+                # Detach the finished item from the tree being built
+                elem.clear()
+                if parents:
+                    parents[-1].remove(elem)
         except Exception as e:
-            logger.error(f"Error parsing XML: {e}")
+            logger.error(f"Error parsing XML from {source_label}: {e}")
 
-        return events
+    def parse_feed(self, xml_content: Union[str, bytes], source_label: str):
+        return list(self.iter_feed(xml_content, source_label))
 
-    async def normalize_and_save(self, items: list):
-        """Similar to CTFtime, but adapted for RSS items."""
-        count = 0
-        new_events = []
-        async with AsyncSessionLocal() as session:
-            for item in items:
-                source_id = f"rss_{hash(item['id'])}"
+    @staticmethod
+    def _normalize_item(elem, source_label: str) -> dict:
+        fields = {}
+        for child in elem:
+            name = _local_name(child.tag)
+            if name == "link" and child.get("href") is not None:
+                # Atom: prefer the rel="alternate" (or rel-less) link
+                if child.get("rel", "alternate") == "alternate":
+                    fields.setdefault("link", child.get("href"))
+                continue
+            fields.setdefault(name, (child.text or "").strip())
+
+        link = fields.get("link", "")
+        now = datetime.now(timezone.utc).isoformat()
+        return {
+            # GUID (RSS) / id (Atom) when present, else link
+            "id": fields.get("guid") or fields.get("id") or link,
+            "title": fields.get("title") or "No Title",
+            "url": link,
+            "description": (
+                fields.get("description")
+                or fields.get("summary")
+                or fields.get("content")
+                or ""
+            ),
+            # RSS items often lack future event dates, using now as placeholder for "News"
+            "start": now,
+            "finish": now,
+            "source": source_label,
+        }
 
-                query = select(Event).where(Event.source_id == source_id)
-                result = await session.execute(query)
-                if result.scalar_one_or_none():
+    @staticmethod
+    def make_source_id(key: str) -> str:
+        """Deterministic dedup key from an item's GUID/link (stable across processes)."""
+        parts = urlsplit(key.strip())
+        if parts.scheme in ("http", "https"):
+            # Normalize URL noise so the same item always maps to the same key
+            key = urlunsplit(
+                (
+                    parts.scheme.lower(),
+                    parts.netloc.lower(),
+                    parts.path.rstrip("/") or "/",
+                    parts.query,
+                    "",
+                )
+            )
+        else:
+            key = key.strip()
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+        return f"rss_{digest}"
+
+    @staticmethod
+    async def adopt_legacy_rows(session, by_url: dict) -> int:
+        """
+        Re-key rows saved under the old per-process hash() ids (rss_<int>) to
+        the stable id in `by_url` (link -> source_id), so they are not inserted
+        and announced a second time.
+        """
+        if not by_url:
+            return 0
+        result = await session.execute(
+            select(Event.id, Event.url).where(
+                Event.url.in_(by_url), Event.source_id.regexp_match(r"^rss_-?[0-9]+$")
+            )
+        )
+        legacy = result.all()
+        if not legacy:
+            return 0
+        taken = set(
+            (
+                await session.scalars(
+                    select(Event.source_id).where(
+                        Event.source_id.in_({by_url[url] for _, url in legacy})
+                    )
+                )
+            ).all()
+        )
+        adopted = 0
+        for event_id, url in legacy:
+            if by_url[url] in taken:
+                continue
+            taken.add(by_url[url])
+            await session.execute(
+                update(Event).where(Event.id == event_id).values(source_id=by_url[url])
+            )
+            adopted += 1
+        return adopted
+
+    async def rekey_legacy_rows(self, feeds: list) -> int:
+        """
+        One-off upgrade step (manage.py rekey_rss): fetch each feed and re-key
+        the legacy rows its items map to. Run it once before the first ingest
+        with stable ids; rows that left their feed are never re-ingested anyway.
+        """
+        adopted = 0
+        async with AsyncSessionLocal() as session:
+            for url in dict.fromkeys(feeds):
+                try:
+                    response = await self.fetch(url)
+                except Exception as e:
+                    logger.error(f"Failed to fetch feed {url}: {e}")
                     continue
+                by_url = {
+                    item["url"]: self.make_source_id(item["id"])
+                    for item in self.iter_feed(response.content, source_label=url)
+                    if item["url"]
+                }
+                for chunk in chunked(list(by_url.items()), self.UPSERT_CHUNK_SIZE):
+                    adopted += await self.adopt_legacy_rows(session, dict(chunk))
+            await session.commit()
+        logger.info(f"Re-keyed {adopted} RSS events saved under legacy ids")
+        return adopted
+
+    async def normalize_and_save(self, items: Iterable[dict], notify: bool = True):
+        """Similar to CTFtime, but adapted for RSS items. Returns new (created) events."""
+        from src.app.services.ai import AIService
+        from src.app.services.outbox import OutboxService
 
-                new_event = Event(
-                    source_id=source_id,
-                    title=item["title"],
-                    description=item["description"][:500] + "...",  # Truncate check
-                    url=item["url"],
-                    type="conference",  # Assume RSS feeds track confs/news
-                    start_time=datetime.fromisoformat(item["start"]),
-                    end_time=datetime.fromisoformat(item["finish"]),
-                    meta={"source": item["source"]},
+        items = list(items)
+        # Same tagging path as CTFtime (heuristics plus the optional backend)
+        all_tags = await AIService.tag_batch(
+            (item["title"], item["description"]) for item in items
+        )
+
+        # No fingerprint: RSS rows are insert-only and their times are per-run
+        # placeholders, so a digest would change every run and never be compared
+        rows = {}
+        for item, tags in zip(items, all_tags):
+            source_id = self.make_source_id(item["id"])
+            rows[source_id] = {
+                "source_id": source_id,
+                "title": item["title"],
+                # Truncate check
+                "description": (item["description"] or "")[:500] + "...",
+                "url": item["url"],
+                "type": "conference",  # Assume RSS feeds track confs/news
+                "start_time": datetime.fromisoformat(item["start"]),
+                "end_time": datetime.fromisoformat(item["finish"]),
+                "tags": normalize_tags(tags),
+                "meta": {"source": item["source"]},
+            }
+
+        new_events = []
+        async with AsyncSessionLocal() as session:
+            # The conflict clause doubles as the existence check: only rows
+            # that were actually inserted come back from RETURNING.
+            for chunk in chunked(list(rows.values()), self.UPSERT_CHUNK_SIZE):
+                stmt = (
+                    insert(Event)
+                    .values(chunk)
+                    .on_conflict_do_nothing(index_elements=[Event.source_id])
+                    .returning(Event)
                 )
-                session.add(new_event)
-                new_events.append(new_event)
-                count += 1
+                result = await session.scalars(stmt)
+                new_events.extend(result.all())
 
+            if notify and new_events:
+                await OutboxService.enqueue(session, new_events)
             await session.commit()
             return new_events
 
+    async def ingest_feed(self, url: str) -> tuple[dict, list]:
+        """Fetch, parse and save a single feed. Returns (stats, new events)."""
+        stats = {"feed": url, "status": "ok", "items": 0, "new": 0, "seconds": 0.0}
+        new_events = []
+        started = time.perf_counter()
+        try:
+            xml = await asyncio.wait_for(
+                self.fetch_feed(url), timeout=settings.RSS_FEED_TIMEOUT
+            )
+            if xml is None:
+                stats["status"] = "unchanged"
+            else:
+                if len(xml) > settings.RSS_PARSE_OFFLOAD_BYTES:
+                    # Big documents are parsed off the event loop
+                    items = await asyncio.to_thread(self.parse_feed, xml, url)
+                else:
+                    items = self.iter_feed(xml, source_label=url)
+                new_events = await self.normalize_and_save(_counted(items, stats))
+                await self.remember(url)
+                stats["new"] = len(new_events)
+        except asyncio.TimeoutError:
+            logger.error(f"Timed out fetching feed {url}")
+            stats["status"] = "timeout"
+        except Exception as e:
+            logger.error(f"Failed to process feed {url}: {e}")
+            stats["status"] = f"error: {e}"
+
+        stats["seconds"] = round(time.perf_counter() - started, 3)
+        return stats, new_events
+
+    async def ingest_feeds(self, feeds: list) -> tuple[list, list]:
+        """
+        Ingest feeds concurrently, bounded globally and per host, so one slow
+        feed (or server) cannot stall the rest. Returns (per-feed stats, new events).
+        """
+        semaphore = asyncio.Semaphore(settings.RSS_MAX_CONCURRENCY)
+        host_limits = defaultdict(
+            lambda: asyncio.Semaphore(settings.RSS_PER_HOST_CONCURRENCY)
+        )
 
+        async def _bounded(url: str):
+            # Host first: feeds queued behind a busy host must not sit on
+            # global slots that other hosts could use
+            async with host_limits[urlsplit(url).netloc], semaphore:
+                return await self.ingest_feed(url)
+
+        # dict.fromkeys drops duplicate feeds while keeping config order
+        results = await asyncio.gather(*(_bounded(u) for u in dict.fromkeys(feeds)))
+
+        stats = [feed_stats for feed_stats, _ in results]
+        new_events = [event for _, events in results for event in events]
+        return stats, new_events
+
+
+@exclusive("rss")
 async def ingest_rss_feeds(ctx):
-    from src.app.services.notifications import NotificationService
+    from src.app.services.cache import bump_data_version
+    from src.app.services.outbox import OutboxService
 
     logger.info("Starting RSS Ingest Job")
-    scraper = RSSScraper()
-    total_new = 0
+    scraper = RSSScraper(fetcher=ctx.get("http"))
+    started = time.perf_counter()
 
-    for feed_url in scraper.FEEDS:
-        try:
-            xml = await scraper.fetch_feed(feed_url)
-            items = scraper.parse_feed(xml, source_label=feed_url)
-            new_events = await scraper.normalize_and_save(items)
+    stats, new_events = await scraper.ingest_feeds(scraper.FEEDS)
 
-            if new_events:
-                await NotificationService.notify_new_events(new_events)
-                total_new += len(new_events)
+    if new_events:
+        await bump_data_version()
+        # Each chat gets one digest per outbox batch, not one message per feed
+        await OutboxService.schedule_delivery(ctx.get("redis"))
+
+    return {
+        "feeds": stats,
+        "new": len(new_events),
+        "failed": sum(1 for s in stats if s["status"] not in ("ok", "unchanged")),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def _local_name(tag: str) -> str:
+    """'{http://www.w3.org/2005/Atom}entry' -> 'entry'"""
+    return tag.rsplit("}", 1)[-1]
 
-        except Exception as e:
-            logger.error(f"Failed to process feed {feed_url}: {e}")
 
-    return f"RSS Ingest Complete. New items: {total_new}"
+def _counted(items: Iterable[dict], stats: dict) -> Iterator[dict]:
+    """Pass items through while counting them into stats["items"]."""
+    for item in items:
+        stats["items"] += 1
+        yield item
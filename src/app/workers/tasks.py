@@ -1,17 +1,43 @@
+from arq import cron, func
 from arq.connections import RedisSettings
+import logging
+import random
+import time
 from datetime import timedelta
+
+from prometheus_client import start_http_server
+
 from src.app.core.config import settings
+from src.app.core.metrics import track_job
+from src.app.core.redis import close_redis
+from src.app.services.notifications import NotificationService
+from src.app.services.outbox import DELIVER_JOB, OutboxService
+from src.app.workers.http import HttpFetcher
 
 from src.app.workers.scrapers.ctftime import ingest_ctftime_events
 from src.app.workers.scrapers.rss import ingest_rss_feeds
 
+logger = logging.getLogger(__name__)
+
 
 async def startup(ctx):
     print("ARQ Worker Starting...")
+    # One pooled HTTP client for every scraper job in this worker
+    ctx["http"] = HttpFetcher(redis=ctx["redis"])
+    if settings.WORKER_METRICS_PORT:
+        # The worker is its own process: Prometheus scrapes it separately
+        try:
+            start_http_server(settings.WORKER_METRICS_PORT)
+        except OSError as e:
+            logger.error(f"Worker metrics server not started: {e}")
 
 
 async def shutdown(ctx):
     print("ARQ Worker Shutting down...")
+    if "http" in ctx:
+        await ctx["http"].aclose()
+    await NotificationService.aclose()
+    await close_redis()
 
 
 async def sample_task(ctx, word: str):
@@ -19,9 +45,74 @@ async def sample_task(ctx, word: str):
     return f"Hello {word}"
 
 
+async def deliver_notifications(ctx):
+    """Drain the notification outbox (queued by ingest jobs and every minute)."""
+    return await OutboxService.drain()
+
+
+def every(minutes: int) -> dict:
+    """cron() fields firing every `minutes`, which must divide an hour or a day."""
+    if 0 < minutes < 60 and 60 % minutes == 0:
+        return {"minute": set(range(0, 60, minutes))}
+    if minutes > 0 and minutes % 60 == 0 and 24 % (minutes // 60) == 0:
+        return {"hour": set(range(0, 24, minutes // 60)), "minute": 0}
+    raise ValueError(f"Interval must divide an hour or a day, got {minutes} minutes")
+
+
+def scheduled(job: str, minutes: int):
+    """
+    Cron trigger for `job`: enqueues it under a job id fixed per interval slot,
+    so every replica's cron fires into the same id and ARQ keeps just one.
+    A random delay spreads the real start (and the load on the source).
+    """
+
+    async def trigger(ctx):
+        slot = int(time.time() // (minutes * 60))
+        delay = random.uniform(0, settings.SCRAPER_JITTER_SECONDS)  # nosec B311
+        queued = await ctx["redis"].enqueue_job(
+            job, _job_id=f"{job}:{slot}", _defer_by=delay
+        )
+        if queued is None:
+            logger.info(f"{job} already queued for slot {slot}")
+        return slot
+
+    trigger.__qualname__ = trigger.__name__ = f"schedule_{job}"
+    return trigger
+
+
+def interval(minutes) -> int:
+    return minutes or settings.SCRAPER_INTERVAL_MINUTES
+
+
+CTFTIME_INTERVAL = interval(settings.CTFTIME_INTERVAL_MINUTES)
+RSS_INTERVAL = interval(settings.RSS_INTERVAL_MINUTES)
+
+
 class WorkerSettings:
-    functions = [sample_task, ingest_ctftime_events, ingest_rss_feeds]
-    redis_settings = RedisSettings(host=settings.REDIS_HOST, port=settings.REDIS_PORT)
+    functions = [
+        sample_task,
+        track_job(ingest_ctftime_events),
+        track_job(ingest_rss_feeds),
+        # No stored result, so the fixed job id frees up as soon as a drain ends
+        func(track_job(deliver_notifications), name=DELIVER_JOB, keep_result=0),
+    ]
+    # Picks up retries whose backoff has expired and rows left by a crashed drain
+    cron_jobs = [
+        cron(track_job(deliver_notifications), second=30),
+        cron(
+            scheduled("ingest_ctftime_events", CTFTIME_INTERVAL),
+            run_at_startup=True,
+            **every(CTFTIME_INTERVAL),
+        ),
+        cron(
+            scheduled("ingest_rss_feeds", RSS_INTERVAL),
+            run_at_startup=True,
+            **every(RSS_INTERVAL),
+        ),
+    ]
+    redis_settings = RedisSettings(
+        host=settings.REDIS_HOST, port=settings.REDIS_PORT, database=settings.REDIS_DB
+    )
     on_startup = startup
     on_shutdown = shutdown
     job_timeout = timedelta(minutes=10)
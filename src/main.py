@@ -1,10 +1,13 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 import os
 
 from src.app.core.config import settings
+from src.app.core.metrics import MetricsMiddleware, render_metrics
+from src.app.core.redis import close_redis
+from src.app.services.snapshot import snapshots
 from src.app.api.endpoints import events, calendar
 
 
@@ -12,9 +15,13 @@ from src.app.api.endpoints import events, calendar
 async def lifespan(app: FastAPI):
     # Startup logic (e.g., DB connection check, Redis pool)
     print("Startup: CTF Tracker is initializing...")
+    if settings.EVENTS_SNAPSHOT:
+        snapshots.start()
     yield
     # Shutdown logic
     print("Shutdown: Cleanup resources...")
+    await snapshots.stop()
+    await close_redis()
 
 
 app = FastAPI(
@@ -23,6 +30,8 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+app.add_middleware(MetricsMiddleware)
+
 # Include Routers
 app.include_router(events.router, prefix="/api/events", tags=["events"])
 app.include_router(calendar.router, prefix="/calendar", tags=["calendar"])
@@ -39,15 +48,37 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    from src.app.services.health import check_health_status
+    from src.app.db.session import pool_stats
+    from src.app.services.cache import response_cache_summary
+    from src.app.services.health import check_readiness
 
-    status = await check_health_status()
-    if status["overall"] != "PASS":
-        # In a real K8s probe we might return 500, but for now 200 with details is fine
-        pass
+    status = dict(await check_readiness())
+    status["response_cache"] = response_cache_summary()
+    status["db_pool"] = pool_stats.summary()
     return status
 
 
+@app.get("/health/live")
+async def liveness():
+    """The process is up and serving; no dependencies are touched."""
+    return {"status": "PASS"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """503 until the database and Redis both answer (cached a few seconds)."""
+    from src.app.services.health import check_readiness
+
+    status = await check_readiness()
+    return JSONResponse(status, status_code=200 if status["overall"] == "PASS" else 503)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -1,11 +1,18 @@
+import os
 import pytest_asyncio
+from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from src.app.db.session import get_db
 from src.app.core.config import settings
+from src.app.services.cache import bump_data_version
 from src.main import app
 
+# Tests bump data versions and write cache keys: keep them off the app's Redis
+# DB (clients read this when they are created, i.e. inside each test's loop)
+settings.REDIS_DB = int(os.environ.get("TEST_REDIS_DB", "15"))
+
 # Use an in-memory SQLite DB for testing logic, or separate Postgres DB
 # For MVP simplicity, we will mock the DB dependency or run against the dev DB (careful!)
 # Ideally, use a test container or separate DB.
@@ -42,6 +49,24 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
     await test_engine.dispose()
 
 
+@pytest_asyncio.fixture
+async def shared_session(db_session, monkeypatch) -> AsyncSession:
+    """
+    Route the modules that open their own AsyncSessionLocal (scrapers, the
+    outbox drain) to the rolled-back test session.
+    """
+    from src.app.services import outbox
+    from src.app.workers.scrapers import ctftime, rss
+
+    @asynccontextmanager
+    async def session_factory():
+        yield db_session
+
+    for module in (ctftime, rss, outbox):
+        monkeypatch.setattr(module, "AsyncSessionLocal", session_factory)
+    return db_session
+
+
 @pytest_asyncio.fixture
 async def client(db_session) -> AsyncGenerator[AsyncClient, None]:
     """
@@ -53,9 +78,12 @@ async def client(db_session) -> AsyncGenerator[AsyncClient, None]:
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    # Each test's rows are rolled back, so start from fresh response caches
+    await bump_data_version()
 
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as c:
         yield c
 
     app.dependency_overrides.clear()
-
@@ -0,0 +1,138 @@
+import pytest
+
+from src.app.services.ai import AIService, KeywordMatcher, LocalTaggingBackend
+
+
+def test_matcher_respects_word_boundaries():
+    match = AIService.matcher.match
+    assert match("We maintain a remodel of the old site") == []
+    assert match("An AI model for adversarial examples") == ["ml"]
+
+
+def test_matcher_multiword_prefix_and_multiple_categories():
+    match = AIService.matcher.match
+    assert match("Steganography and Machine   Learning") == ["forensics", "ml"]
+    assert match("Heap exploitation, XSS and cryptographic attacks") == [
+        "crypto",
+        "pwn",
+        "web",
+    ]
+
+
+def test_matcher_maps_shared_terms_to_every_category():
+    matcher = KeywordMatcher({"a": ["shared", "x"], "b": ["shared*"]})
+    assert matcher.match("SHARED") == ["a", "b"]
+    assert matcher.match("sharedness") == ["b"]
+
+
+def test_matcher_terms_ending_in_symbols():
+    matcher = KeywordMatcher({"lang": ["c++", ".net"], "web": ["node*"]})
+    assert matcher.match("Fuzzing C++ and .NET apps") == ["lang"]
+    assert matcher.match("c++11 or asp.net") == []
+    assert matcher.match("nodejs") == ["web"]
+
+
+def test_generate_tags_batch_matches_async_api():
+    items = [("Pwn2Own", "heap overflow"), ("Cloud Village", None), ("Meetup", "")]
+    assert AIService.generate_tags_batch(items) == [["pwn"], ["cloud"], []]
+
+
+@pytest.mark.asyncio
+async def test_generate_tags():
+    assert await AIService.generate_tags("RSA challenge", "aes too") == ["crypto"]
+
+
+class CountingBackend(LocalTaggingBackend):
+    name = "test-counting"
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__(latency)
+        self.calls = []
+
+    async def tag_batch(self, items):
+        self.calls.append(len(items))
+        await super().tag_batch(items)
+        return [["llm"] for _ in items]
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    from src.app.core.config import settings
+
+    backend = CountingBackend()
+    monkeypatch.setattr(AIService, "backend", backend)
+    monkeypatch.setattr(settings, "TAG_BACKEND_BATCH_SIZE", 2)
+    return backend
+
+
+async def _clear_cache(items):
+    from src.app.core.redis import get_redis
+    from src.app.services.ai import _content_digest
+
+    keys = [
+        AIService.CACHE_KEY.format(
+            backend=CountingBackend.name, digest=_content_digest(t, d)
+        )
+        for t, d in items
+    ]
+    await get_redis().delete(*keys)
+
+
+@pytest.mark.asyncio
+async def test_backend_tags_are_batched_and_cached(backend):
+    items = [(f"Cache test {n}", "pwn") for n in range(5)]
+    await _clear_cache(items)
+    try:
+        tags = await AIService.tag_batch(items)
+        assert tags == [["llm", "pwn"]] * 5
+        assert sorted(backend.calls) == [1, 2, 2]
+
+        # Unchanged events are served from the cache
+        assert await AIService.tag_batch(items) == tags
+        assert len(backend.calls) == 3
+    finally:
+        await _clear_cache(items)
+
+
+@pytest.mark.asyncio
+async def test_backend_timeout_falls_back_to_heuristics(backend, monkeypatch):
+    from src.app.core.config import settings
+
+    monkeypatch.setattr(settings, "TAG_BACKEND_TIMEOUT", 0.05)
+    backend.latency = 1.0
+    items = [("Timeout test", "xss")]
+    await _clear_cache(items)
+
+    assert await AIService.tag_batch(items) == [["web"]]
+
+
+@pytest.mark.asyncio
+async def test_backend_tags_survive_a_redis_outage(backend, monkeypatch):
+    from src.app.services import ai
+
+    class DownRedis:
+        async def mget(self, keys):
+            raise ConnectionError("redis down")
+
+    monkeypatch.setattr(ai, "get_redis", lambda: DownRedis())
+
+    assert await AIService.tag_batch([("Outage test", "xss")]) == [["llm", "web"]]
+
+
+@pytest.mark.asyncio
+async def test_backend_result_count_mismatch_is_ignored(backend, monkeypatch):
+    async def short_batch(items):
+        return [["llm"]]
+
+    monkeypatch.setattr(backend, "tag_batch", short_batch)
+    items = [("Mismatch test 1", "rop"), ("Mismatch test 2", "")]
+    await _clear_cache(items)
+
+    assert await AIService.tag_batch(items) == [["pwn"], []]
+
+
+def test_tagging_backend_is_abstract():
+    from src.app.services.ai import TaggingBackend
+
+    with pytest.raises(TypeError):
+        TaggingBackend()
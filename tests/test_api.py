@@ -29,3 +29,266 @@ async def test_read_calendar(client: AsyncClient):
     assert response.status_code == 200
     assert response.headers["content-type"].startswith("text/calendar")
     assert "BEGIN:VCALENDAR" in response.text
+
+
+@pytest.mark.asyncio
+async def test_calendar_conditional_get(client: AsyncClient):
+    from email.utils import formatdate
+    from src.app.services.cache import get_data_state
+
+    # The streamed miss already carries the validators of the cached copy
+    first = await client.get("/calendar/ctf.ics")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    cached = await client.get("/calendar/ctf.ics")
+    assert cached.headers["etag"] == etag
+    assert cached.headers["last-modified"] == first.headers["last-modified"]
+    # Last-Modified is when the data changed, not when the feed was rendered
+    state = await get_data_state()
+    assert first.headers["last-modified"] == formatdate(state.changed_at, usegmt=True)
+
+    cached = await client.get("/calendar/ctf.ics", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    since = await client.get(
+        "/calendar/ctf.ics",
+        headers={"If-Modified-Since": first.headers["last-modified"]},
+    )
+    assert since.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_calendar_gzip(client: AsyncClient):
+    await client.get("/calendar/ctf.ics")
+    response = await client.get(
+        "/calendar/ctf.ics", headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    # httpx transparently decompresses
+    assert "BEGIN:VCALENDAR" in response.text
+
+    refused = await client.get(
+        "/calendar/ctf.ics", headers={"Accept-Encoding": "gzip;q=0, identity"}
+    )
+    assert "content-encoding" not in refused.headers
+    assert refused.content == response.content
+
+
+async def _add_tagged_events(db_session):
+    from datetime import datetime, timedelta, timezone
+    from src.app.db.models import Event
+
+    start = datetime.now(timezone.utc) + timedelta(days=3000)
+    specs = [
+        ("filter_pwn", ["pwn"], "Jeopardy", 50.0),
+        ("filter_crypto", ["crypto", "web"], "Attack-Defense", 30.0),
+        ("filter_light", ["pwn"], "Jeopardy", 5.0),
+        ("filter_web", ["web"], "Jeopardy", 80.0),
+    ]
+    db_session.add_all(
+        Event(
+            source_id=source_id,
+            title=source_id,
+            url="https://example.com",
+            type="ctf",
+            format=format,
+            tags=tags,
+            weight=weight,
+            start_time=start,
+            end_time=start,
+        )
+        for source_id, tags, format, weight in specs
+    )
+    await db_session.flush()
+
+
+@pytest.mark.asyncio
+async def test_filter_events_by_tags_and_weight(client: AsyncClient, db_session):
+    await _add_tagged_events(db_session)
+
+    response = await client.get(
+        "/api/events/", params={"tags": "PWN,crypto", "min_weight": 25, "limit": 1000}
+    )
+    assert response.status_code == 200
+    titles = {e["title"] for e in response.json() if e["title"].startswith("filter_")}
+    assert titles == {"filter_pwn", "filter_crypto"}
+
+    response = await client.get(
+        "/api/events/",
+        params={"tags": "crypto,web", "tag_match": "all", "limit": 1000},
+    )
+    titles = {e["title"] for e in response.json() if e["title"].startswith("filter_")}
+    assert titles == {"filter_crypto"}
+
+    response = await client.get(
+        "/api/events/", params={"format": "Jeopardy", "min_weight": 60, "limit": 1000}
+    )
+    titles = {e["title"] for e in response.json() if e["title"].startswith("filter_")}
+    assert titles == {"filter_web"}
+
+
+@pytest.mark.asyncio
+async def test_filtered_calendar_feed(client: AsyncClient, db_session):
+    await _add_tagged_events(db_session)
+
+    response = await client.get(
+        "/calendar/ctf.ics", params={"tags": "pwn", "min_weight": 25}
+    )
+    assert response.status_code == 200
+    assert "filter_pwn" in response.text
+    assert "filter_light" not in response.text
+    assert "filter_web" not in response.text
+
+
+@pytest.mark.asyncio
+async def test_events_keyset_pagination(client: AsyncClient, db_session):
+    await _add_tagged_events(db_session)
+    params = {"tags": "pwn,crypto,web", "limit": 3}
+
+    first = await client.get("/api/events/", params=params)
+    assert first.status_code == 200
+    assert len(first.json()) == 3
+    cursor = first.headers["x-next-cursor"]
+    assert 'rel="next"' in first.headers["link"]
+
+    second = await client.get("/api/events/", params={**params, "cursor": cursor})
+    assert len(second.json()) == 1
+    assert "x-next-cursor" not in second.headers
+
+    ids = [e["id"] for e in first.json() + second.json()]
+    assert len(set(ids)) == 4
+
+
+@pytest.mark.asyncio
+async def test_events_invalid_cursor(client: AsyncClient):
+    response = await client.get("/api/events/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_event_list_and_detail_shapes(client: AsyncClient, db_session):
+    await _add_tagged_events(db_session)
+
+    listed = await client.get("/api/events/", params={"tags": "crypto"})
+    (summary,) = [e for e in listed.json() if e["title"] == "filter_crypto"]
+    assert set(summary) == {
+        "id",
+        "title",
+        "start_time",
+        "end_time",
+        "type",
+        "format",
+        "weight",
+        "url",
+        "logo",
+        "tags",
+    }
+    assert summary["tags"] == ["crypto", "web"]
+
+    detail = await client.get(f"/api/events/{summary['id']}")
+    assert detail.status_code == 200
+    assert detail.json()["title"] == "filter_crypto"
+    assert "raw_metadata" in detail.json()
+
+    missing = await client.get("/api/events/0")
+    assert missing.status_code == 404
+
+
+def test_responses_are_shaped_by_their_models():
+    import json
+    from src.app.api.endpoints.events import SUMMARY_LIST, render
+
+    row = {
+        "id": 1,
+        "title": "t",
+        "start_time": "2099-01-01T00:00:00+00:00",
+        "end_time": "2099-01-02T00:00:00+00:00",
+        "type": "ctf",
+        "weight": "25",
+        "url": "https://example.com",
+        "description": "not part of a summary",
+    }
+    (event,) = json.loads(render(SUMMARY_LIST, [row]).body)
+    assert event["weight"] == 25.0
+    assert event["tags"] == [] and event["logo"] is None
+    assert "description" not in event
+
+
+async def _add_search_events(db_session):
+    from datetime import datetime, timedelta, timezone
+    from src.app.db.models import Event
+
+    start = datetime.now(timezone.utc) + timedelta(days=3000)
+    specs = [
+        ("search_1", "Zephyrquest Invitational", "Kernel exploitation finals"),
+        ("search_2", "Harbor Summit", "Talks on zephyrquest style kernel bugs"),
+        ("search_3", "Unrelated Meetup", "Networking"),
+    ]
+    db_session.add_all(
+        Event(
+            source_id=source_id,
+            title=title,
+            description=description,
+            url="https://example.com",
+            type="conference",
+            start_time=start,
+            end_time=start,
+        )
+        for source_id, title, description in specs
+    )
+    await db_session.flush()
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_title_over_description(client: AsyncClient, db_session):
+    await _add_search_events(db_session)
+
+    response = await client.get("/api/events/search", params={"q": "zephyrquest"})
+    assert response.status_code == 200
+    titles = [e["title"] for e in response.json()]
+    assert titles == ["Zephyrquest Invitational", "Harbor Summit"]
+    assert response.json()[0]["score"] > response.json()[1]["score"]
+
+
+@pytest.mark.asyncio
+async def test_search_fuzzy_title_and_validation(client: AsyncClient, db_session):
+    await _add_search_events(db_session)
+
+    # Typo misses the tsvector but still matches the title by trigram similarity
+    response = await client.get("/api/events/search", params={"q": "zephyrqest"})
+    assert [e["title"] for e in response.json()] == ["Zephyrquest Invitational"]
+
+    # Not shadowed by /{event_id}; q is required
+    response = await client.get("/api/events/search")
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_events_response_cache(client: AsyncClient, db_session):
+    from src.app.services.cache import bump_data_version, response_cache_stats
+
+    await _add_tagged_events(db_session)
+    params = {"tags": "pwn", "limit": 1}
+    hits = response_cache_stats["events", "hit"]
+
+    first = await client.get("/api/events/", params=params)
+    assert "x-cache" not in first.headers
+    # Same query, different spelling: one normalized cache entry
+    second = await client.get("/api/events/", params={"tags": "PWN", "limit": "1"})
+    assert second.headers["x-cache"] == "HIT"
+    assert second.content == first.content
+    assert second.headers["x-next-cursor"] == first.headers["x-next-cursor"]
+    assert response_cache_stats["events", "hit"] == hits + 1
+
+    # Ingest bumping the version makes the next request go back to the DB
+    await bump_data_version()
+    third = await client.get("/api/events/", params=params)
+    assert "x-cache" not in third.headers
+
+    event_id = first.json()[0]["id"]
+    await client.get(f"/api/events/{event_id}")
+    detail = await client.get(f"/api/events/{event_id}")
+    assert detail.headers["x-cache"] == "HIT"
+    assert detail.json()["id"] == event_id
@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from ics import Calendar
+
+from src.app.db.models import Event
+from src.app.services.calendar_feed import (
+    _upcoming_query,
+    accepts_gzip,
+    escape_text,
+    fold_line,
+    render_calendar,
+    render_calendar_ics,
+)
+
+
+def test_escape_text():
+    assert escape_text("a,b;c\\d\r\ne") == r"a\,b\;c\\d\ne"
+    assert escape_text(None) == ""
+
+
+def test_accepts_gzip_honours_q_values():
+    assert accepts_gzip("gzip, deflate, br")
+    assert accepts_gzip("br;q=1.0, gzip;q=0.5")
+    assert accepts_gzip("*")
+    assert not accepts_gzip("gzip;q=0")
+    assert not accepts_gzip("gzip; q=0.0, *")
+    assert not accepts_gzip("*;q=0")
+    assert not accepts_gzip("")
+
+
+def test_fold_line_respects_octets_and_utf8():
+    line = "DESCRIPTION:" + "ğ" * 100
+    folded = fold_line(line)
+    parts = folded.removesuffix("\r\n").split("\r\n ")
+
+    assert len(parts[0].encode("utf-8")) <= 75
+    assert all(len(p.encode("utf-8")) <= 74 for p in parts[1:])
+    assert "".join(parts) == line
+    assert fold_line("SUMMARY:short") == "SUMMARY:short\r\n"
+
+
+def test_feed_query_skips_unused_columns():
+    selected = {c.name for c in _upcoming_query().selected_columns}
+    assert "meta" not in selected and "search_vector" not in selected
+    assert {"source_id", "title", "start_time", "end_time"} <= selected
+
+
+@pytest.mark.asyncio
+async def test_streaming_renderer_matches_ics_baseline(db_session):
+    start = datetime.now(timezone.utc) + timedelta(days=3650)
+    db_session.add_all(
+        Event(
+            source_id=f"calendar_test_{n}",
+            title=f"Stream, Test; {n}",
+            description="Line one\nLine two " + "x" * 200,
+            url=f"https://example.com/{n}",
+            type="ctf",
+            format="Jeopardy",
+            start_time=start + timedelta(hours=n),
+            end_time=start + timedelta(hours=n + 1),
+            weight=10.0,
+        )
+        for n in range(3)
+    )
+    await db_session.flush()
+
+    streamed = Calendar((await render_calendar(db_session)).decode("utf-8"))
+    baseline = Calendar((await render_calendar_ics(db_session)).decode("utf-8"))
+
+    def summary(cal):
+        return sorted((e.name, e.begin, e.end, e.description) for e in cal.events)
+
+    ours = [e for e in summary(streamed) if "Stream, Test" in e[0]]
+    assert len(ours) == 3
+    assert ours == [e for e in summary(baseline) if "Stream, Test" in e[0]]
+
+
+@pytest.mark.asyncio
+async def test_streamed_miss_fills_cache_incrementally(db_session):
+    import gzip
+
+    from src.app.services.cache import bump_data_version, get_data_state
+    from src.app.services.calendar_feed import get_cached_feed, stream_and_cache
+    from src.app.services.event_filters import EventFilters
+
+    await bump_data_version()
+    filters = EventFilters()
+    feed, state = await get_cached_feed(filters)
+    assert feed is None
+
+    body = b"".join([c async for c in stream_and_cache(db_session, filters, state)])
+
+    feed, _ = await get_cached_feed(filters)
+    assert feed is not None and feed.body == body
+    assert gzip.decompress(feed.gzipped) == body
+    assert feed.validators["ETag"] == f'W/"ics-{(await get_data_state()).version}"'
@@ -0,0 +1,39 @@
+import pytest
+from sqlalchemy import text
+
+from src.app.core.config import settings
+from src.app.db import session as db_session_module
+from src.app.db.session import engine, engine_options, pool_stats
+
+
+def test_engine_options_profiles(monkeypatch):
+    options = engine_options()
+    assert options["echo"] is False
+    assert options["pool_size"] == settings.DB_POOL_SIZE
+    assert options["connect_args"]["statement_cache_size"] == (
+        settings.DB_STATEMENT_CACHE_SIZE
+    )
+
+    monkeypatch.setattr(db_session_module.settings, "DB_PGBOUNCER", True)
+    connect_args = engine_options()["connect_args"]
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    name_func = connect_args["prepared_statement_name_func"]
+    assert name_func() != name_func()
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_track_checkouts():
+    # Pooled connections are bound to the loop of whichever test opened them
+    await engine.dispose(close=False)
+    checkouts = pool_stats.checkouts
+    try:
+        async with engine.connect() as first:
+            async with engine.connect() as second:
+                assert pool_stats.in_use >= 2
+                await first.execute(text("SELECT 1"))
+                await second.execute(text("SELECT 1"))
+        assert pool_stats.checkouts >= checkouts + 2
+        assert pool_stats.summary()["checkout_max_ms"] >= 0
+    finally:
+        await engine.dispose()
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from src.app.db.models import Event
+from src.app.services.event_filters import EventFilters, backfill_tags
+
+
+def test_cache_key_keeps_zero_min_weight():
+    assert EventFilters(min_weight=0).cache_key() != EventFilters().cache_key()
+    assert EventFilters(tags=["Pwn", "web"]).cache_key() == (
+        EventFilters(tags=["web", "pwn "]).cache_key()
+    )
+
+
+@pytest.mark.asyncio
+async def test_backfill_tags_from_meta_and_text(db_session):
+    start = datetime.now(timezone.utc) + timedelta(days=3000)
+    legacy = [
+        Event(
+            source_id="backfill_ctftime",
+            title="Legacy CTF",
+            url="https://example.com/legacy",
+            start_time=start,
+            end_time=start,
+            meta={"tags": ["PWN", " web", ""]},
+        ),
+        Event(
+            source_id="backfill_rss",
+            title="XSS workshop",
+            description="browser bugs",
+            url="https://example.com/legacy-rss",
+            type="conference",
+            start_time=start,
+            end_time=start,
+            meta={"source": "test"},
+        ),
+    ]
+    db_session.add_all(legacy)
+    await db_session.flush()
+
+    stats = await backfill_tags(db_session)
+
+    assert stats["from_meta"] >= 1 and stats["retagged"] >= 1
+    result = await db_session.execute(
+        select(Event.source_id, Event.tags)
+        .where(Event.source_id.in_(["backfill_ctftime", "backfill_rss"]))
+        .order_by(Event.source_id)
+    )
+    assert result.all() == [
+        ("backfill_ctftime", ["pwn", "web"]),
+        ("backfill_rss", ["web"]),
+    ]
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+from src.app.db.session import engine
+from src.app.services import health
+
+
+@pytest.fixture
+def fresh_health(monkeypatch):
+    monkeypatch.setattr(health, "_cached", None)
+    monkeypatch.setattr(health, "_cached_at", 0.0)
+
+
+@pytest.mark.asyncio
+async def test_liveness_touches_nothing(client: AsyncClient, monkeypatch):
+    async def boom(status):
+        raise AssertionError("liveness must not run dependency checks")
+
+    monkeypatch.setattr(health, "_check_database", boom)
+    monkeypatch.setattr(health, "_check_redis", boom)
+    response = await client.get("/health/live")
+    assert response.status_code == 200
+    assert response.json() == {"status": "PASS"}
+
+
+@pytest.mark.asyncio
+async def test_readiness_is_cached(client: AsyncClient, fresh_health, monkeypatch):
+    # The app engine's pooled connections belong to earlier tests' loops
+    await engine.dispose(close=False)
+    try:
+        first = await client.get("/health/ready")
+        assert first.status_code == 200
+        assert first.json()["overall"] == "PASS"
+        assert first.json()["events_estimate"] >= 0
+
+        calls = []
+
+        async def counting(status):
+            calls.append(1)
+            status["redis"] = "PASS"
+
+        monkeypatch.setattr(health, "_check_redis", counting)
+        second = await client.get("/health/ready")
+        assert second.json() == first.json()
+        assert calls == []
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_readiness_checks_concurrently_with_timeouts(
+    client: AsyncClient, fresh_health, monkeypatch
+):
+    async def slow(status):
+        await asyncio.sleep(1)
+
+    async def ok(status):
+        status["database"] = "PASS"
+
+    monkeypatch.setattr(health.settings, "HEALTH_CHECK_TIMEOUT", 0.2)
+    monkeypatch.setattr(health, "_check_redis", slow)
+    monkeypatch.setattr(health, "_check_database", slow)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    response = await client.get("/health/ready")
+    # Both checks time out together, not one after the other
+    assert loop.time() - started < 0.39
+    assert response.status_code == 503
+    assert response.json()["redis"].startswith("FAIL: timeout")
+
+    monkeypatch.setattr(health, "_cached", None)
+    monkeypatch.setattr(health, "_check_database", ok)
+    response = await client.get("/health/ready")
+    assert response.json()["database"] == "PASS"
+    assert response.json()["overall"] == "FAIL"
@@ -0,0 +1,119 @@
+import httpx
+import pytest
+
+from src.app.workers.http import HttpFetcher
+
+
+def _fetcher(handler, max_retries: int = 3) -> HttpFetcher:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    # Zero backoff keeps the retry tests instant
+    return HttpFetcher(
+        client=client, max_retries=max_retries, backoff_base=0, backoff_max=0
+    )
+
+
+@pytest.mark.asyncio
+async def test_fetch_retries_on_429_and_5xx():
+    statuses = iter([429, 503, 200])
+    calls = []
+
+    def handler(request):
+        calls.append(request.url)
+        return httpx.Response(next(statuses), text="ok")
+
+    async with _fetcher(handler) as fetcher:
+        response = await fetcher.get("https://example.com/feed")
+
+    assert response.status_code == 200
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_fetch_raises_after_max_retries():
+    def handler(request):
+        return httpx.Response(500)
+
+    async with _fetcher(handler, max_retries=1) as fetcher:
+        with pytest.raises(httpx.HTTPStatusError):
+            await fetcher.get("https://example.com/feed")
+
+
+@pytest.mark.asyncio
+async def test_fetch_does_not_retry_client_errors():
+    calls = []
+
+    def handler(request):
+        calls.append(request.url)
+        return httpx.Response(404)
+
+    async with _fetcher(handler) as fetcher:
+        with pytest.raises(httpx.HTTPStatusError):
+            await fetcher.get("https://example.com/missing")
+    assert len(calls) == 1
+
+
+def test_backoff_is_capped_and_honours_retry_after():
+    fetcher = HttpFetcher(client=httpx.AsyncClient(), backoff_base=1.0, backoff_max=4.0)
+    assert all(0 <= fetcher.backoff(attempt) <= 4.0 for attempt in range(10))
+    assert fetcher.backoff(0, retry_after="2") == 2.0
+    assert fetcher.backoff(0, retry_after="120") == 4.0
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_short_circuits_unchanged_sources():
+    from redis import asyncio as aioredis
+    from src.app.core.config import settings
+
+    seen_headers = []
+
+    def handler(request):
+        seen_headers.append(dict(request.headers))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, text="<rss/>", headers={"ETag": '"v1"'})
+
+    redis = aioredis.from_url(
+        f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}"
+    )
+    url = "https://example.com/test-conditional.xml"
+    fetcher = _fetcher(handler)
+    fetcher.redis = redis
+    await redis.delete(fetcher._validator_key(url))
+    try:
+        first = await fetcher.get_if_changed(url)
+        assert first is not None
+        # Not remembered yet (pipeline "failed"), so the body is served again
+        assert await fetcher.get_if_changed(url) is not None
+
+        await fetcher.remember(url, first)
+        assert await fetcher.get_if_changed(url) is None
+        assert seen_headers[-1]["if-none-match"] == '"v1"'
+    finally:
+        await redis.delete(fetcher._validator_key(url))
+        await fetcher.aclose()
+        await redis.aclose()
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_skips_identical_body_without_validators():
+    from redis import asyncio as aioredis
+    from src.app.core.config import settings
+
+    def handler(request):
+        return httpx.Response(200, text="same body")
+
+    redis = aioredis.from_url(
+        f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}"
+    )
+    url = "https://example.com/test-digest.json"
+    fetcher = _fetcher(handler)
+    fetcher.redis = redis
+    await redis.delete(fetcher._validator_key(url))
+    try:
+        response = await fetcher.get_if_changed(url)
+        await fetcher.remember(url, response)
+        assert await fetcher.get_if_changed(url) is None
+    finally:
+        await redis.delete(fetcher._validator_key(url))
+        await fetcher.aclose()
+        await redis.aclose()
@@ -0,0 +1,111 @@
+import asyncio
+
+import httpx
+import pytest
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+
+from src.app.core.metrics import track_job
+from src.app.workers.http import HttpFetcher
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.mark.asyncio
+async def test_route_latency_uses_route_template(client: AsyncClient):
+    labels = {"method": "GET", "route": "/api/events/{event_id}", "status": "404"}
+    before = _sample("http_request_duration_seconds_count", **labels)
+
+    await client.get("/api/events/999999999")
+    await client.get("/api/events/999999998")
+
+    assert _sample("http_request_duration_seconds_count", **labels) == before + 2
+    # The client fixture's session has its own engine; time one app-engine query
+    from sqlalchemy import text
+    from src.app.db.session import engine
+
+    await engine.dispose(close=False)
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert "db_query_duration_seconds_bucket" in response.text
+    assert 'route="/api/events/{event_id}"' in response.text
+    assert "db_pool_in_use" in response.text
+
+
+@pytest.mark.asyncio
+async def test_scraper_fetch_metrics_per_source():
+    statuses = iter([503, 200])
+
+    def handler(request):
+        return httpx.Response(next(statuses), content=b"x" * 10)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    ok = _sample("scraper_fetch_responses_total", source="metrics", status="200")
+    failed = _sample("scraper_fetch_responses_total", source="metrics", status="503")
+    size = _sample("scraper_fetch_bytes_total", source="metrics")
+
+    async with HttpFetcher(client=client, backoff_base=0, backoff_max=0) as fetcher:
+        await fetcher.get("https://example.com/", source="metrics")
+
+    assert (
+        _sample("scraper_fetch_responses_total", source="metrics", status="200")
+        == ok + 1
+    )
+    assert (
+        _sample("scraper_fetch_responses_total", source="metrics", status="503")
+        == failed + 1
+    )
+    assert _sample("scraper_fetch_bytes_total", source="metrics") == size + 20
+
+
+@pytest.mark.asyncio
+async def test_track_job_outcomes():
+    async def metrics_job(ctx, fail=False):
+        if fail:
+            raise ValueError("boom")
+        return "done"
+
+    async def slow_metrics_job(ctx):
+        await asyncio.sleep(1)
+
+    job = track_job(metrics_job)
+    assert job.__name__ == "metrics_job"
+    assert await job({}) == "done"
+    with pytest.raises(ValueError):
+        await job({}, fail=True)
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(track_job(slow_metrics_job)({}), 0.01)
+
+    assert _sample("arq_job_runs_total", job="metrics_job", outcome="success") == 1
+    assert _sample("arq_job_runs_total", job="metrics_job", outcome="failure") == 1
+    assert (
+        _sample("arq_job_runs_total", job="slow_metrics_job", outcome="cancelled") == 1
+    )
+    assert _sample("arq_job_duration_seconds_count", job="metrics_job") == 2
+
+
+@pytest.mark.asyncio
+async def test_track_job_counts_lock_skips_separately():
+    from src.app.core.redis import get_redis
+    from src.app.workers.scrapers import LOCK_KEY, exclusive
+
+    @exclusive("metrics-test")
+    async def locked_metrics_job(ctx):
+        return "done"
+
+    job = track_job(locked_metrics_job)
+    lock = get_redis().lock(LOCK_KEY.format(source="metrics-test"), timeout=10)
+    assert await lock.acquire(blocking=False)
+    try:
+        assert await job({}) == {"skipped": "locked"}
+    finally:
+        await lock.release()
+    assert await job({}) == "done"
+
+    labels = {"job": "locked_metrics_job"}
+    assert _sample("arq_job_runs_total", outcome="skipped", **labels) == 1
+    assert _sample("arq_job_runs_total", outcome="success", **labels) == 1
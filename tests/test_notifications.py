@@ -0,0 +1,177 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from src.app.services.notifications import (
+    MAX_MESSAGE_LENGTH,
+    NotificationService,
+    RateLimiter,
+    TokenBucket,
+    split_message,
+)
+
+
+@pytest.fixture
+def telegram(monkeypatch):
+    """Route NotificationService through a mock transport; yields sent payloads."""
+    sent = []
+    replies = []
+
+    def handler(request):
+        sent.append(json.loads(request.content))
+        return replies.pop(0) if replies else httpx.Response(200, json={"ok": True})
+
+    async def install(global_rate=1000.0, per_chat_rate=1000.0):
+        monkeypatch.setattr(NotificationService, "_loop", asyncio.get_running_loop())
+        monkeypatch.setattr(
+            NotificationService,
+            "_client",
+            httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+        monkeypatch.setattr(
+            NotificationService, "_limiter", RateLimiter(global_rate, per_chat_rate)
+        )
+        return sent, replies
+
+    return install
+
+
+def test_split_message_at_line_boundaries():
+    lines = [f"line {i:05d} " + "x" * 90 + "\n" for i in range(200)]
+    chunks = split_message("".join(lines))
+
+    assert len(chunks) > 1
+    assert all(len(c) <= MAX_MESSAGE_LENGTH for c in chunks)
+    assert "".join(chunks) == "".join(lines)
+    # No event line is cut in half
+    assert all(c.endswith("\n") for c in chunks)
+
+
+def test_split_message_cuts_long_lines_outside_markup():
+    import re
+
+    line = "word &amp; <a href='https://example.com/x'>link</a> " * 200
+    chunks = split_message(line)
+
+    assert len(chunks) > 1
+    assert all(len(c) <= MAX_MESSAGE_LENGTH for c in chunks)
+    assert "".join(chunks) == line
+    for chunk in chunks:
+        # Cut after whitespace, with every tag and entity whole
+        assert chunk.endswith(" ")
+        assert not re.search(r"[<>&]", re.sub(r"<[^<>]*>|&\w+;", "", chunk))
+
+    # No whitespace at all: still cut, never dropped
+    huge = "y" * (MAX_MESSAGE_LENGTH + 10)
+    assert [len(c) for c in split_message(huge)] == [MAX_MESSAGE_LENGTH, 10]
+
+
+def test_format_event_bounds_line_length():
+    from datetime import datetime, timezone
+
+    from src.app.db.models import Event
+
+    start = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    long_title = Event(title="<&>" * 2000, url="https://example.com", start_time=start)
+    line = NotificationService.format_event(long_title)
+    assert len(line) < 1500
+    assert "…</a>" in line and line.count("&lt;") <= 67
+
+    long_url = Event(title="t", url="https://e.com/" + "a" * 5000, start_time=start)
+    assert NotificationService.format_event(long_url) == "🔹 t (2030-01-01)\n"
+
+
+def test_token_bucket_rejects_zero_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=50, capacity=5)
+    started = time.monotonic()
+    for _ in range(15):
+        await bucket.acquire()
+    # 5 burst tokens, then 10 more at 50/s
+    assert time.monotonic() - started >= 0.18
+
+
+@pytest.mark.asyncio
+async def test_sends_fan_out_concurrently(telegram):
+    sent, _ = await telegram()
+    chats = list(range(300))
+
+    # The outbox drain sends each chat's digest concurrently like this
+    started = time.monotonic()
+    results = await asyncio.gather(
+        *(NotificationService.send_telegram_message(str(c), "hello") for c in chats)
+    )
+
+    assert all(results)
+    assert sorted(int(p["chat_id"]) for p in sent) == chats
+    assert time.monotonic() - started < 2
+
+
+@pytest.mark.asyncio
+async def test_send_honours_retry_after(telegram):
+    sent, replies = await telegram()
+    replies.append(
+        httpx.Response(
+            429,
+            json={"ok": False, "error_code": 429, "parameters": {"retry_after": 0.2}},
+        )
+    )
+
+    started = time.monotonic()
+    assert await NotificationService.send_telegram_message("42", "hi")
+    assert time.monotonic() - started >= 0.2
+    assert len(sent) == 2
+
+
+@pytest.mark.asyncio
+async def test_flood_limit_pauses_other_chats(telegram):
+    sent, replies = await telegram()
+    replies.append(httpx.Response(429, json={"parameters": {"retry_after": 0.2}}))
+
+    started = time.monotonic()
+    first = asyncio.create_task(NotificationService.send_telegram_message("1", "a"))
+    await asyncio.sleep(0.05)
+    assert await NotificationService.send_telegram_message("2", "b")
+
+    # Chat 2 waited out the retry_after that chat 1 was given
+    assert time.monotonic() - started >= 0.2
+    assert await first
+
+
+@pytest.mark.asyncio
+async def test_long_digest_is_split_not_truncated(telegram):
+    from datetime import datetime, timezone
+
+    from src.app.db.models import Event
+
+    sent, _ = await telegram()
+    events = [
+        Event(
+            id=i,
+            title=f"Event <{i}> " + "x" * 60,
+            url=f"https://example.com/{i}",
+            start_time=datetime(2030, 1, 1, tzinfo=timezone.utc),
+        )
+        for i in range(150)
+    ]
+
+    messages = NotificationService.digest_messages(events)
+    assert len(messages) > 1
+    # Each message knows exactly which events it carries
+    assert [e for _, listed in messages for e in listed] == events
+    for text, _ in messages:
+        assert await NotificationService.send_telegram_message("1", text)
+
+    texts = [p["text"] for p in sent]
+    assert len(texts) == len(messages)
+    assert all(len(t) <= MAX_MESSAGE_LENGTH for t in texts)
+    combined = "".join(texts)
+    assert all(f"Event &lt;{i}&gt;" in combined for i in range(150))
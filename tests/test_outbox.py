@@ -0,0 +1,188 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, func, select, update
+
+from src.app.core.config import settings
+from src.app.db.models import Event, NotificationOutbox
+from src.app.services.notifications import NotificationService
+from src.app.services.outbox import DELIVER_JOB, OutboxService
+from src.app.workers.scrapers import rss
+
+
+@pytest_asyncio.fixture
+async def outbox_session(shared_session, monkeypatch):
+    """Shared test session, with every alert going to two admin chats."""
+    monkeypatch.setattr(settings, "TELEGRAM_ADMIN_IDS", [11, 22])
+    monkeypatch.setattr(settings, "TELEGRAM_BOT_TOKEN", "test-token")
+    return shared_session
+
+
+def _item(n: int) -> dict:
+    return {
+        "id": f"https://example.com/outbox-test/{n}",
+        "title": f"Outbox Conf {n}",
+        "url": f"https://example.com/outbox-test/{n}",
+        "description": None,
+        "start": f"2099-01-0{n + 1}T10:00:00+00:00",
+        "finish": f"2099-01-0{n + 1}T10:00:00+00:00",
+        "source": "test",
+    }
+
+
+async def _outbox_rows(session):
+    result = await session.execute(
+        select(NotificationOutbox).order_by(NotificationOutbox.id)
+    )
+    return result.scalars().all()
+
+
+@pytest.mark.asyncio
+async def test_new_events_are_queued_with_the_upsert(outbox_session):
+    scraper = rss.RSSScraper()
+    await scraper.normalize_and_save([_item(n) for n in range(3)])
+
+    rows = await _outbox_rows(outbox_session)
+    assert sorted((r.chat_id, r.status) for r in rows) == sorted(
+        [("11", "pending")] * 3 + [("22", "pending")] * 3
+    )
+
+    # Re-ingesting creates no new events, hence no new alerts
+    await scraper.normalize_and_save([_item(n) for n in range(3)])
+    # ...and re-queuing an alert is a no-op
+    events = (await outbox_session.scalars(select(Event).limit(1))).all()
+    await OutboxService.enqueue(outbox_session, events)
+    await scraper.normalize_and_save([_item(3)], notify=False)
+    assert len(await _outbox_rows(outbox_session)) == 6
+
+
+@pytest.mark.asyncio
+async def test_drain_delivers_digests_and_backs_off(outbox_session, monkeypatch):
+    sent = []
+
+    async def fake_send(chat_id, message):
+        sent.append((chat_id, message))
+        return chat_id == "11"
+
+    monkeypatch.setattr(NotificationService, "send_telegram_message", fake_send)
+    monkeypatch.setattr(settings, "OUTBOX_MAX_ATTEMPTS", 2)
+    await rss.RSSScraper().normalize_and_save([_item(n) for n in range(3)])
+
+    stats = await OutboxService.drain()
+    assert stats == {"batches": 1, "sent": 3, "failed": 3}
+    # One digest per chat, events in start order
+    chat_11 = [message for chat_id, message in sent if chat_id == "11"]
+    assert len(chat_11) == 1
+    positions = [chat_11[0].index(f"Outbox Conf {n}") for n in range(3)]
+    assert positions == sorted(positions)
+
+    rows = await _outbox_rows(outbox_session)
+    assert {r.status for r in rows if r.chat_id == "11"} == {"sent"}
+    assert {(r.status, r.attempts) for r in rows if r.chat_id == "22"} == {
+        ("pending", 1)
+    }
+
+    # Backing off: nothing is due yet, and delivered rows never go out again
+    sent.clear()
+    assert (await OutboxService.drain())["batches"] == 0
+    assert sent == []
+
+    await outbox_session.execute(
+        update(NotificationOutbox).values(available_at=func.now())
+    )
+    assert await OutboxService.drain() == {"batches": 1, "sent": 0, "failed": 3}
+    assert [chat_id for chat_id, _ in sent] == ["22"]
+    rows = await _outbox_rows(outbox_session)
+    assert {r.status for r in rows if r.chat_id == "22"} == {"failed"}
+
+
+@pytest.mark.asyncio
+async def test_multi_message_digest_resends_only_undelivered_rows(
+    outbox_session, monkeypatch
+):
+    sent, calls = [], []
+
+    async def flaky_send(chat_id, message):
+        # Only the second message ever sent fails
+        calls.append(message)
+        if len(calls) == 2:
+            return False
+        sent.append(message)
+        return True
+
+    monkeypatch.setattr(NotificationService, "send_telegram_message", flaky_send)
+    monkeypatch.setattr(settings, "TELEGRAM_ADMIN_IDS", [11])
+    items = [
+        {**_item(0), "id": f"https://example.com/outbox-long/{n}", "title": "T" * 150}
+        for n in range(60)
+    ]
+    for n, item in enumerate(items):
+        item["url"] = item["id"]
+        item["start"] = item["finish"] = f"2099-01-01T10:{n:02d}:00+00:00"
+    await rss.RSSScraper().normalize_and_save(items)
+
+    stats = await OutboxService.drain()
+    assert len(calls) == 2
+    first = sent[0].count("🔹")
+    assert 0 < first < 60
+    assert stats == {"batches": 1, "sent": first, "failed": 60 - first}
+
+    sent.clear()
+    await outbox_session.execute(
+        update(NotificationOutbox).values(available_at=func.now())
+    )
+    stats = await OutboxService.drain()
+    # Only the undelivered rows went out again
+    assert stats == {"batches": 1, "sent": 60 - first, "failed": 0}
+    assert sum(message.count("🔹") for message in sent) == 60 - first
+    rows = await _outbox_rows(outbox_session)
+    assert {r.status for r in rows} == {"sent"}
+
+
+@pytest.mark.asyncio
+async def test_alerts_for_deleted_events_are_settled_silently(
+    outbox_session, monkeypatch
+):
+    sent = []
+
+    async def fake_send(chat_id, message):
+        sent.append(message)
+        return True
+
+    claim = OutboxService.claim.__func__
+
+    async def claim_then_delete(cls, session, limit):
+        rows = await claim(cls, session, limit)
+        await session.execute(delete(Event))
+        return rows
+
+    monkeypatch.setattr(NotificationService, "send_telegram_message", fake_send)
+    monkeypatch.setattr(OutboxService, "claim", classmethod(claim_then_delete))
+    await rss.RSSScraper().normalize_and_save([_item(0)])
+
+    assert await OutboxService.drain() == {"batches": 1, "sent": 2, "failed": 0}
+    assert sent == []
+
+
+@pytest.mark.asyncio
+async def test_ingest_schedules_delivery_instead_of_sending(monkeypatch):
+    async def fake_ingest_feeds(self, feeds):
+        return [], [Event(id=1, title="x")]
+
+    async def must_not_send(*args, **kwargs):
+        raise AssertionError("ingest must not talk to Telegram")
+
+    class FakeArqRedis:
+        def __init__(self):
+            self.jobs = []
+
+        async def enqueue_job(self, name, _job_id=None):
+            self.jobs.append((name, _job_id))
+
+    monkeypatch.setattr(rss.RSSScraper, "ingest_feeds", fake_ingest_feeds)
+    monkeypatch.setattr(NotificationService, "send_telegram_message", must_not_send)
+    redis = FakeArqRedis()
+
+    result = await rss.ingest_rss_feeds({"redis": redis})
+
+    assert result["new"] == 1
+    assert redis.jobs == [(DELIVER_JOB, DELIVER_JOB)]
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from src.app.core.config import settings
+from src.app.core.redis import get_redis
+from src.app.workers import tasks
+from src.app.workers.scrapers import LOCK_KEY, exclusive
+
+
+def test_every_builds_cron_fields():
+    assert tasks.every(15) == {"minute": {0, 15, 30, 45}}
+    assert tasks.every(60) == {"hour": set(range(24)), "minute": 0}
+    assert tasks.every(360) == {"hour": {0, 6, 12, 18}, "minute": 0}
+    for bad in (0, 45, 90, 420):
+        with pytest.raises(ValueError):
+            tasks.every(bad)
+
+
+@pytest.mark.asyncio
+async def test_scheduled_runs_share_one_job_id_per_slot(monkeypatch):
+    class FakeArqRedis:
+        def __init__(self):
+            self.jobs = {}
+
+        async def enqueue_job(self, name, _job_id=None, _defer_by=None):
+            if _job_id in self.jobs:
+                return None
+            self.jobs[_job_id] = (name, _defer_by)
+            return object()
+
+    monkeypatch.setattr(tasks.time, "time", lambda: 3600 * 100 + 125)
+    redis = FakeArqRedis()
+    trigger = tasks.scheduled("ingest_rss_feeds", 30)
+    assert trigger.__name__ == "schedule_ingest_rss_feeds"
+
+    # Two replicas firing the same cron tick
+    await trigger({"redis": redis})
+    await trigger({"redis": redis})
+
+    assert list(redis.jobs) == ["ingest_rss_feeds:200"]
+    name, delay = redis.jobs["ingest_rss_feeds:200"]
+    assert name == "ingest_rss_feeds"
+    assert 0 <= delay <= settings.SCRAPER_JITTER_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_exclusive_skips_overlapping_runs():
+    key = LOCK_KEY.format(source="test")
+    await get_redis().delete(key)
+    started, release = asyncio.Event(), asyncio.Event()
+
+    @exclusive("test")
+    async def slow_job(ctx):
+        started.set()
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(slow_job({}))
+    await started.wait()
+    assert await slow_job({}) == {"skipped": "locked"}
+
+    release.set()
+    assert await first == "done"
+    assert not await get_redis().exists(key)
@@ -0,0 +1,298 @@
+import httpx
+import pytest
+from datetime import datetime
+from sqlalchemy.future import select
+
+from src.app.db.models import Event
+from src.app.workers.scrapers import chunked
+from src.app.workers.scrapers import ctftime, rss
+
+
+def _ctftime_item(event_id: int, title: str = "Test CTF") -> dict:
+    return {
+        "id": event_id,
+        "title": title,
+        "description": "pwn and crypto challenges",
+        "url": f"https://example.com/{event_id}",
+        "start": "2099-01-01T10:00:00+00:00",
+        "finish": "2099-01-02T10:00:00+00:00",
+        "format": "Jeopardy",
+        "weight": 25,
+    }
+
+
+def test_chunked():
+    assert [list(c) for c in chunked([1, 2, 3, 4, 5], 2)] == [[1, 2], [3, 4], [5]]
+    assert list(chunked([], 3)) == []
+
+
+@pytest.mark.asyncio
+async def test_ctftime_bulk_upsert_returns_only_new(shared_session, monkeypatch):
+    scraper = ctftime.CTFTimeScraper()
+    monkeypatch.setattr(scraper, "UPSERT_CHUNK_SIZE", 2)
+    base = 900_000_000
+
+    first = await scraper.normalize_and_save(
+        [_ctftime_item(base + i) for i in range(3)]
+    )
+    assert sorted(e.source_id for e in first) == [
+        f"ctftime_{base + i}" for i in range(3)
+    ]
+
+    second = await scraper.normalize_and_save(
+        [_ctftime_item(base, title="Renamed CTF"), _ctftime_item(base + 3)]
+    )
+    assert [e.source_id for e in second] == [f"ctftime_{base + 3}"]
+
+    result = await shared_session.execute(
+        select(Event.title).where(Event.source_id == f"ctftime_{base}")
+    )
+    assert result.scalar_one() == "Renamed CTF"
+
+
+@pytest.mark.asyncio
+async def test_ctftime_sync_skips_unchanged_rows(shared_session):
+    scraper = ctftime.CTFTimeScraper()
+    base = 910_000_000
+    items = [_ctftime_item(base + i) for i in range(3)]
+
+    stats = {}
+    await scraper.normalize_and_save(items, stats=stats)
+    assert stats == {"inserted": 3, "updated": 0, "unchanged": 0}
+
+    items[1] = _ctftime_item(base + 1, title="Changed")
+    stats = {}
+    new_events = await scraper.normalize_and_save(items, stats=stats)
+    assert new_events == []
+    assert stats == {"inserted": 0, "updated": 1, "unchanged": 2}
+
+
+def test_rss_source_id_is_stable_and_normalized():
+    make = rss.RSSScraper.make_source_id
+    key = make("https://Example.com/news/item-1/")
+    assert key == make("https://example.com/news/item-1#comments")
+    assert key != make("https://example.com/news/item-2")
+    # sha256 based, so identical in every worker process
+    assert key == "rss_f1223ee393625fddc637cd16adec4cd9"
+
+
+def _rss_item(n: int) -> dict:
+    return {
+        "id": f"https://example.com/rss-test/{n}",
+        "title": f"Conf {n}",
+        "url": f"https://example.com/rss-test/{n}",
+        "description": None,
+        "start": "2099-01-01T10:00:00+00:00",
+        "finish": "2099-01-01T10:00:00+00:00",
+        "source": "test",
+    }
+
+
+@pytest.mark.asyncio
+async def test_rss_rerun_inserts_no_duplicates(shared_session):
+    scraper = rss.RSSScraper()
+    items = [_rss_item(n) for n in range(5)]
+
+    first = await scraper.normalize_and_save(items)
+    assert len(first) == 5
+    assert {e.fingerprint for e in first} == {None}
+
+    second = await scraper.normalize_and_save(items + [_rss_item(5)])
+    assert [e.title for e in second] == ["Conf 5"]
+
+
+@pytest.mark.asyncio
+async def test_rss_legacy_ids_are_rekeyed_not_reannounced(shared_session):
+    legacy = _rss_item(7)
+    shared_session.add(
+        Event(
+            source_id="rss_-4242",
+            title=legacy["title"],
+            url=legacy["url"],
+            start_time=datetime.fromisoformat(legacy["start"]),
+            end_time=datetime.fromisoformat(legacy["finish"]),
+        )
+    )
+    await shared_session.flush()
+
+    scraper = rss.RSSScraper()
+    feed = (
+        f"<rss><channel><item><guid>{legacy['id']}</guid>"
+        f"<link>{legacy['url']}</link><title>{legacy['title']}</title>"
+        "</item></channel></rss>"
+    )
+
+    async def fake_fetch(url, **kwargs):
+        return httpx.Response(200, content=feed.encode())
+
+    scraper.fetch = fake_fetch
+    assert await scraper.rekey_legacy_rows(["https://feeds.example.com/rss"]) == 1
+
+    new_events = await scraper.normalize_and_save([legacy], notify=False)
+
+    assert new_events == []
+    result = await shared_session.execute(
+        select(Event.source_id).where(Event.url == legacy["url"])
+    )
+    assert result.scalars().all() == [rss.RSSScraper.make_source_id(legacy["id"])]
+
+
+@pytest.mark.asyncio
+async def test_rss_feeds_are_ingested_concurrently(monkeypatch):
+    import asyncio
+    import time
+
+    scraper = rss.RSSScraper()
+    feeds = [f"https://feed{n}.example.com/rss.xml" for n in range(5)]
+
+    async def fake_fetch(url):
+        await asyncio.sleep(0.2)
+        if "feed3" in url:
+            raise RuntimeError("boom")
+        return None if "feed4" in url else "<rss/>"
+
+    async def fake_save(items):
+        return []
+
+    monkeypatch.setattr(scraper, "fetch_feed", fake_fetch)
+    monkeypatch.setattr(scraper, "iter_feed", lambda xml, source_label: iter([]))
+    monkeypatch.setattr(scraper, "normalize_and_save", fake_save)
+
+    started = time.perf_counter()
+    stats, new_events = await scraper.ingest_feeds(feeds)
+    elapsed = time.perf_counter() - started
+
+    # Close to the slowest single feed, not the sum of all five
+    assert elapsed < 0.6
+    assert new_events == []
+    assert [s["status"] for s in stats] == [
+        "ok",
+        "ok",
+        "ok",
+        "error: boom",
+        "unchanged",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_rss_busy_host_does_not_hold_global_slots(monkeypatch):
+    import asyncio
+    import time
+
+    monkeypatch.setattr(rss.settings, "RSS_MAX_CONCURRENCY", 2)
+    monkeypatch.setattr(rss.settings, "RSS_PER_HOST_CONCURRENCY", 1)
+    scraper = rss.RSSScraper()
+    feeds = [f"https://busy.example.com/{n}.xml" for n in range(4)]
+    feeds.append("https://other.example.com/rss.xml")
+    done = {}
+    started = time.perf_counter()
+
+    async def fake_fetch(url):
+        await asyncio.sleep(0.1)
+        done[url] = time.perf_counter() - started
+        return None
+
+    monkeypatch.setattr(scraper, "fetch_feed", fake_fetch)
+    await scraper.ingest_feeds(feeds)
+
+    # Runs alongside the first busy-host feed instead of queueing behind it
+    assert done["https://other.example.com/rss.xml"] < 0.15
+
+
+RSS_DOC = b"""<?xml version="1.0" encoding="ISO-8859-1"?>
+<rss version="2.0"><channel><title>Confs</title>
+<item><title>USENIX Security \xe9t\xe9</title><link>https://example.com/a</link>
+<guid>urn:a</guid><description>Call for papers</description></item>
+<item><link>https://example.com/b</link></item>
+</channel></rss>"""
+
+ATOM_DOC = """<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Confs</title>
+<entry><title>DEF CON</title><id>tag:example.com,2026:dc</id>
+<link rel="self" href="https://example.com/self"/>
+<link href="https://example.com/defcon"/><summary>Vegas</summary></entry>
+</feed>"""
+
+
+def test_parse_rss2_feed():
+    items = rss.RSSScraper().parse_feed(RSS_DOC, source_label="test")
+    assert [i["title"] for i in items] == ["USENIX Security été", "No Title"]
+    assert items[0]["id"] == "urn:a"
+    assert items[0]["description"] == "Call for papers"
+    assert items[1]["id"] == items[1]["url"] == "https://example.com/b"
+
+
+def test_parse_atom_feed():
+    items = rss.RSSScraper().parse_feed(ATOM_DOC, source_label="test")
+    assert len(items) == 1
+    assert items[0]["url"] == "https://example.com/defcon"
+    assert items[0]["id"] == "tag:example.com,2026:dc"
+    assert items[0]["description"] == "Vegas"
+
+
+def test_parse_feed_rejects_entities_and_keeps_partial_results():
+    bomb = b"""<?xml version="1.0"?><!DOCTYPE r [<!ENTITY a "aaaa">]>
+<rss><channel><item><title>&a;</title></item></channel></rss>"""
+    assert rss.RSSScraper().parse_feed(bomb, source_label="test") == []
+
+    truncated = RSS_DOC[: RSS_DOC.index(b"<item><link>")]
+    items = rss.RSSScraper().parse_feed(truncated, source_label="test")
+    assert [i["id"] for i in items] == ["urn:a"]
+
+
+def test_ctftime_slices_are_grid_aligned():
+    from datetime import datetime, timedelta, timezone
+
+    start = datetime(2026, 3, 10, 12, tzinfo=timezone.utc)
+    slices = ctftime.CTFTimeScraper.slices(start, start + timedelta(days=45))
+
+    assert slices[0][0] <= start < slices[0][1]
+    assert slices[-1][1] >= start + timedelta(days=45)
+    assert all(a[1] == b[0] for a, b in zip(slices, slices[1:]))
+    # Same grid an hour later, so cache keys stay stable between runs
+    later = ctftime.CTFTimeScraper.slices(start + timedelta(hours=1), start)
+    assert later == [] or later[0] == slices[0]
+    assert (
+        ctftime.CTFTimeScraper.slices(
+            start + timedelta(hours=1), start + timedelta(days=1)
+        )
+        == slices[:1]
+    )
+
+
+@pytest.mark.asyncio
+async def test_ctftime_fetch_slice_pages_past_the_limit():
+    import httpx
+    from datetime import datetime, timedelta, timezone
+    from src.app.workers.http import HttpFetcher
+
+    def event(n):
+        start = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(days=n)
+        return {"id": n, "start": start.isoformat(), "finish": start.isoformat()}
+
+    all_events = [event(n) for n in range(5)]
+    requests = []
+
+    def handler(request):
+        start = int(request.url.params["start"])
+        limit = int(request.url.params["limit"])
+        requests.append(start)
+        page = [
+            e
+            for e in all_events
+            if datetime.fromisoformat(e["start"]).timestamp() >= start
+        ]
+        return httpx.Response(200, json=page[:limit])
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    async with HttpFetcher(client=client) as fetcher:
+        scraper = ctftime.CTFTimeScraper(fetcher=fetcher)
+        events = await scraper.fetch_slice(
+            datetime(2026, 1, 1, tzinfo=timezone.utc),
+            datetime(2026, 2, 1, tzinfo=timezone.utc),
+            limit=2,
+        )
+
+    assert sorted(e["id"] for e in events) == [0, 1, 2, 3, 4]
+    # Cursor pages overlap by one event: [0,1] [1,2] [2,3] [3,4] [4]
+    assert len(requests) == 5
@@ -0,0 +1,162 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.future import select
+
+from src.app.api.endpoints.events import SUMMARY_COLUMNS
+from src.app.db.models import Event
+from src.app.services import snapshot as snapshot_module
+from src.app.services.event_filters import EventFilters
+from src.app.services.snapshot import EventSnapshot, SnapshotManager, snapshots
+
+
+async def _add_events(db_session):
+    start = datetime.now(timezone.utc) + timedelta(days=4000)
+    specs = [
+        # source_id, type, format, tags, weight, day offset
+        ("snap_a", "ctf", "Jeopardy", ["pwn", "web"], 40.0, 0),
+        ("snap_b", "ctf", "Attack-Defense", ["crypto"], 10.0, 0),
+        ("snap_c", "conference", None, [], 0.0, 1),
+        ("snap_d", "ctf", "Jeopardy", ["pwn"], 90.0, 2),
+        ("snap_e", "ctf", "Jeopardy", ["web", "crypto"], 25.0, 3),
+    ]
+    db_session.add_all(
+        Event(
+            source_id=source_id,
+            title=source_id,
+            url="https://example.com",
+            type=type,
+            format=format,
+            tags=tags,
+            weight=weight,
+            start_time=start + timedelta(days=offset),
+            end_time=start + timedelta(days=offset + 1),
+        )
+        for source_id, type, format, tags, weight, offset in specs
+    )
+    # Already started: never part of an upcoming listing
+    db_session.add(
+        Event(
+            source_id="snap_past",
+            title="snap_past",
+            url="https://example.com",
+            type="ctf",
+            start_time=start - timedelta(days=8000),
+            end_time=start - timedelta(days=7999),
+        )
+    )
+    await db_session.flush()
+
+
+async def _snapshot(db_session, version=None) -> EventSnapshot:
+    result = await db_session.execute(
+        select(*SUMMARY_COLUMNS)
+        .where(Event.source_id.like("snap_%"))
+        .order_by(Event.start_time.asc(), Event.id.asc())
+    )
+    return EventSnapshot([dict(row) for row in result.mappings()], version)
+
+
+def _titles(rows):
+    return [r["title"] for r in rows]
+
+
+@pytest.mark.asyncio
+async def test_snapshot_filters_and_order(db_session):
+    await _add_events(db_session)
+    snap = await _snapshot(db_session)
+    assert snap.starts.typecode == "q"
+
+    assert _titles(snap.query(EventFilters(), 10)) == [
+        "snap_a",
+        "snap_b",
+        "snap_c",
+        "snap_d",
+        "snap_e",
+    ]
+    assert _titles(snap.query(EventFilters(tags=["PWN", "crypto"]), 10)) == [
+        "snap_a",
+        "snap_b",
+        "snap_d",
+        "snap_e",
+    ]
+    all_web_crypto = EventFilters(tags=["web", "crypto"], match_all=True)
+    assert _titles(snap.query(all_web_crypto, 10)) == ["snap_e"]
+    assert snap.query(EventFilters(tags=["unknown"], match_all=True), 10) == []
+    assert _titles(
+        snap.query(EventFilters(type="ctf", format="Jeopardy", min_weight=30), 10)
+    ) == ["snap_a", "snap_d"]
+    assert snap.query(EventFilters(format="King of the Hill"), 10) == []
+
+
+@pytest.mark.asyncio
+async def test_snapshot_matches_sql_pages(client: AsyncClient, db_session):
+    await _add_events(db_session)
+    snap = await _snapshot(db_session)
+    params = {"status": "upcoming", "tags": "pwn,crypto,web", "limit": 2}
+
+    sql_pages, cursor = [], None
+    while True:
+        response = await client.get(
+            "/api/events/", params={**params, **({"cursor": cursor} if cursor else {})}
+        )
+        sql_pages.append(response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+    snapshots.current = snap
+    try:
+        snap_pages, cursor = [], None
+        while True:
+            response = await client.get(
+                "/api/events/",
+                params={**params, **({"cursor": cursor} if cursor else {})},
+            )
+            snap_pages.append(response.json())
+            cursor = response.headers.get("x-next-cursor")
+            if not cursor:
+                break
+    finally:
+        snapshots.current = None
+
+    # Unrelated upcoming events may exist in the dev DB; compare ours only
+    def ours(pages):
+        return [e for page in pages for e in page if e["title"].startswith("snap_")]
+
+    assert ours(snap_pages) == ours(sql_pages)
+    assert _titles(ours(snap_pages)) == ["snap_a", "snap_b", "snap_d", "snap_e"]
+
+
+@pytest.mark.asyncio
+async def test_snapshot_reloads_on_change_notification(db_session, monkeypatch):
+    from src.app.services.cache import bump_data_version, get_data_version
+
+    async def fake_load():
+        return await _snapshot(db_session, await get_data_version())
+
+    monkeypatch.setattr(snapshot_module, "load_snapshot", fake_load)
+    manager = SnapshotManager()
+    manager.start()
+    try:
+        for _ in range(100):
+            if manager.current is not None:
+                break
+            await asyncio.sleep(0.01)
+        first = manager.current
+        assert first is not None
+
+        await _add_events(db_session)
+        version = await bump_data_version()
+        for _ in range(100):
+            if manager.current.version == version:
+                break
+            await asyncio.sleep(0.01)
+
+        assert manager.current is not first
+        assert manager.current.version == version
+        assert len(manager.current) == 6
+    finally:
+        await manager.stop()
@@ -0,0 +1,118 @@
+import pytest
+from sqlalchemy import select
+
+from src.app.core.config import settings
+from src.app.db.models import Event, NotificationOutbox
+from src.app.services.subscriptions import (
+    Rule,
+    SubscriptionMatcher,
+    SubscriptionService,
+)
+from src.app.workers.scrapers import ctftime
+
+
+def _rule(chat_id, tags=(), type=None, format=None, min_weight=None):
+    return Rule(chat_id, frozenset(tags), type, format, min_weight)
+
+
+def _event(event_id, tags=(), type="ctf", format="Jeopardy", weight=0.0):
+    return Event(id=event_id, tags=list(tags), type=type, format=format, weight=weight)
+
+
+def test_matcher_rules():
+    matcher = SubscriptionMatcher(
+        [
+            _rule("pwn", tags=["pwn"]),
+            _rule("pwn_or_web", tags=["pwn", "web"]),
+            _rule("heavy_ad", type="ctf", format="Attack-Defense", min_weight=50),
+            _rule("confs", type="conference"),
+            _rule("everything"),
+            # Same chat through two rules: still one delivery per event
+            _rule("everything", tags=["web"]),
+        ]
+    )
+    events = [
+        _event(1, tags=["pwn", "web"]),
+        _event(2, tags=["crypto"], format="Attack-Defense", weight=80),
+        _event(3, tags=["crypto"], format="Attack-Defense", weight=10),
+        _event(4, type="conference"),
+    ]
+
+    assert matcher.match(events) == [
+        ("confs", 4),
+        ("everything", 1),
+        ("everything", 2),
+        ("everything", 3),
+        ("everything", 4),
+        ("heavy_ad", 2),
+        ("pwn", 1),
+        ("pwn_or_web", 1),
+    ]
+
+
+def test_matcher_only_visits_indexed_rules():
+    rules = [_rule(f"chat{i}", tags=[f"tag{i}"]) for i in range(5000)]
+    rules += [_rule(f"conf{i}", type="conference") for i in range(1000)]
+    matcher = SubscriptionMatcher(rules)
+
+    event = _event(1, tags=["tag7", "tag42"])
+    # Two tag postings; none of the 1000 conference rules or other tags
+    assert {r.chat_id for r in matcher.candidates(event)} == {"chat7", "chat42"}
+    assert matcher.match([event]) == [("chat42", 1), ("chat7", 1)]
+
+
+def test_tagless_rules_are_bucketed_by_type_format_and_weight():
+    rules = [_rule(f"ctf{i}", type="ctf", min_weight=i) for i in range(100)]
+    rules += [_rule(f"ad{i}", format="Attack-Defense") for i in range(100)]
+    rules += [_rule("heavy", min_weight=90)]
+    matcher = SubscriptionMatcher(rules)
+
+    event = _event(1, format="Jeopardy", weight=9.5)
+    # Only the ten ctf rules it meets: no format or heavyweight rules
+    assert {r.chat_id for r in matcher.candidates(event)} == {
+        f"ctf{i}" for i in range(10)
+    }
+    assert all(r.accepts(event) for r in matcher.candidates(event))
+
+    heavy_ad = _event(2, format="Attack-Defense", weight=90)
+    # ctf0..ctf90, every format rule and the heavyweight one
+    assert len(matcher.match([heavy_ad])) == 91 + 100 + 1
+
+
+@pytest.mark.asyncio
+async def test_subscribers_are_queued_on_ingest(shared_session, monkeypatch):
+    monkeypatch.setattr(settings, "TELEGRAM_ADMIN_IDS", [])
+    await SubscriptionService.subscribe(shared_session, "100", tags=["PWN"])
+    await SubscriptionService.subscribe(shared_session, "200", min_weight=90)
+    heavy_web = await SubscriptionService.subscribe(
+        shared_session, "300", tags=["web"], min_weight=50
+    )
+    await SubscriptionService.unsubscribe(shared_session, heavy_web.id)
+
+    # CTFtime ids of its own: test_scrapers uses the 900M and 910M ranges
+    base = 920_000_000
+    items = [
+        {
+            "id": base + n,
+            "title": title,
+            "description": description,
+            "url": f"https://example.com/{base + n}",
+            "start": "2099-01-01T10:00:00+00:00",
+            "finish": "2099-01-02T10:00:00+00:00",
+            "weight": weight,
+        }
+        for n, (title, description, weight) in enumerate(
+            [
+                ("Binary Bash", "pwn and exploitation", 20),
+                ("Web Wars", "web challenges", 95),
+            ]
+        )
+    ]
+    await ctftime.CTFTimeScraper().normalize_and_save(items)
+
+    result = await shared_session.execute(
+        select(NotificationOutbox.chat_id, Event.title)
+        .join(Event, Event.id == NotificationOutbox.event_id)
+        .order_by(NotificationOutbox.chat_id)
+    )
+    assert result.all() == [("100", "Binary Bash"), ("200", "Web Wars")]